@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CommonConfig(AppConfig):
     name = "apps.common"
+
+    def ready(self):
+        import utils.lookups  # noqa: F401
+        from . import checks  # noqa: F401
+        from . import receivers  # noqa: F401
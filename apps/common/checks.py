@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register('graphql', deploy=True)
+def check_graphql_schema_artifact(app_configs, **kwargs):
+    """
+    Make sure prebuilt schema artifact (./manage.py graphql_schema --artifact) is not stale
+    NOTE: Deploy only (./manage.py check --deploy), building the schema is slow for the other commands
+    """
+    if not settings.GRAPHQL_SCHEMA_ARTIFACT:
+        return []
+
+    from main.graphql.schema import schema
+    from main.graphql.artifact import load_schema_artifact, get_stale_types
+
+    try:
+        artifact = load_schema_artifact(settings.GRAPHQL_SCHEMA_ARTIFACT)
+    except (OSError, ValueError, KeyError) as e:
+        return [
+            Error(
+                f'Failed to load GraphQL schema artifact: {e}',
+                hint='Generate using ./manage.py graphql_schema --artifact <path>',
+                id='common.E001',
+            )
+        ]
+    if stale_types := get_stale_types(schema, artifact):
+        return [
+            Error(
+                f'GraphQL schema artifact is stale. Stale types: {", ".join(stale_types)}',
+                hint='Generate using ./manage.py graphql_schema --artifact <path>',
+                id='common.E002',
+            )
+        ]
+    return []
+
+
+# Caches which are not shared between the processes
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register('graphql', 'caches')
+def check_graphql_response_cache(app_configs, **kwargs):
+    """
+    Generation counters (main.graphql.response_cache) are bumped only in the process doing the write,
+    other processes will serve stale responses with a per process cache
+    """
+    if settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT <= 0:
+        return []
+    if settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return [
+            Error(
+                'GRAPHQL_RESPONSE_CACHE_TIMEOUT requires a cache shared between the processes',
+                hint='Provide CACHE_REDIS_URL or set GRAPHQL_RESPONSE_CACHE_TIMEOUT=0',
+                id='common.E003',
+            )
+        ]
+    return []
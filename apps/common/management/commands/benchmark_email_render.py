@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template import loader
+from django.utils import timezone
+
+from main.permalinks import Permalink
+from utils.email import get_common_email_context
+from utils.email_template import render_email_template, clear_email_template_cache
+from apps.user.models import User, EmailNotificationType
+
+
+TEMPLATES = (
+    'emails/user/password_reset/content.html',
+    'emails/user/password_reset/content.txt',
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark email template rendering (renders/sec) with and without the template render cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+
+    @staticmethod
+    def get_contexts(users):
+        return [
+            {
+                'welcome': True,
+                'time': timezone.now(),
+                'location': '127.0.0.1',
+                'device': 'Desktop',
+                'client_reset_password': Permalink.password_reset(f'uid-{user.pk}', f'token-{user.pk}'),
+                **get_common_email_context(user, EmailNotificationType.PASSWORD_RESET),
+            }
+            for user in users
+        ]
+
+    def benchmark(self, render, contexts):
+        start = time.perf_counter()
+        rendered = [
+            render(template_name, context)
+            for context in contexts
+            for template_name in TEMPLATES
+        ]
+        return time.perf_counter() - start, rendered
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        users = User.objects.bulk_create([
+            User(email=f'benchmark-email-{i}@example.com', first_name=f'First {i}')
+            for i in range(options['users'])
+        ])
+        contexts = self.get_contexts(users)
+        renders_count = len(contexts) * len(TEMPLATES)
+
+        clear_email_template_cache()
+        results = {}
+        for label, render in [
+            ('default', loader.render_to_string),
+            ('cached', render_email_template),
+        ]:
+            duration, rendered = self.benchmark(render, contexts)
+            results[label] = (duration, rendered)
+            self.stdout.write(
+                f'- {label:<10} {duration * 1000:>10.2f}ms {renders_count / duration:>12.2f} renders/sec'
+            )
+        if results['default'][1] != results['cached'][1]:
+            raise CommandError('Cached render output is not same as default render output')
+        self.stdout.write(
+            self.style.SUCCESS(f'Speedup: {results["default"][0] / results["cached"][0]:.2f}x (Same output)')
+        )
+        transaction.set_rollback(True)
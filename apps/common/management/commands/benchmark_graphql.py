@@ -0,0 +1,328 @@
+import asyncio
+import contextvars
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient
+
+from utils.db_backends.postgresql_pool.pool import get_pools_stats
+from apps.user.factories import UserFactory
+from apps.project.factories import ProjectFactory
+from apps.project.models import ProjectMembership
+from apps.questionnaire.factories import QuestionnaireFactory
+
+
+class Query:
+    PROJECTS = '''
+        query Projects {
+          private {
+            projects(pagination: {limit: 20, offset: 0}) {
+              count
+              items {
+                id
+                title
+                currentUserRole
+                createdBy { id displayName }
+              }
+            }
+          }
+        }
+    '''
+
+    PROJECT_SCOPE_QUESTIONNAIRES = '''
+        query ProjectScopeQuestionnaires($projectId: ID!) {
+          private {
+            projectScope(pk: $projectId) {
+              questionnaires(pagination: {limit: 20, offset: 0}) {
+                count
+                items {
+                  id
+                  title
+                  createdAt
+                }
+              }
+            }
+          }
+        }
+    '''
+
+    UPDATE_MEMBERSHIPS = '''
+        mutation UpdateMemberships($projectId: ID!, $items: [ProjectMembershipUpdateInput!]) {
+          private {
+            projectScope(pk: $projectId) {
+              updateMemberships(items: $items) {
+                errors
+                results { id clientId role }
+              }
+            }
+          }
+        }
+    '''
+
+    # "Add members" picker: Users not in the project
+    MEMBERS_PICKER = '''
+        query MembersPicker($projectId: ID!, $search: String) {
+          private {
+            users(
+              pagination: {limit: 10, offset: 0},
+              filters: {membersExcludeProject: $projectId, search: $search, excludeMe: true},
+            ) {
+              count
+              items {
+                id
+                displayName
+              }
+            }
+          }
+        }
+    '''
+
+    LOGIN = '''
+        mutation Login($data: LoginInput!) {
+          public {
+            login(data: $data) {
+              ok
+              errors
+            }
+          }
+        }
+    '''
+
+
+# Keep in sync with Command.get_operations
+OPERATION_NAMES = ('projects', 'questionnaires', 'update_memberships', 'members_picker', 'login')
+DEFAULT_MIX = 'projects=4,questionnaires=4,update_memberships=1,login=1'
+# Search values used by the members picker (None -> Without search)
+MEMBERS_PICKER_SEARCHES = (None, 'a', 'an', 'xyz.com')
+
+# Used to count SQL queries per request (shared with the sync_to_async threads)
+current_query_counter = contextvars.ContextVar('current_query_counter', default=None)
+
+
+def count_queries_wrapper(execute, sql, params, many, context):
+    counter = current_query_counter.get()
+    if counter is not None:
+        counter['count'] += 1
+    return execute(sql, params, many, context)
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def get_percentile(values: list[float], percentile: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percentile - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'In-process GraphQL load benchmark. Seeds data using the factories in a temporary test database'
+        ' and runs a mix of operations concurrently against the ASGI handler. Outputs JSON.'
+    )
+    # Checks will import the urls (and the schema) before we start measuring
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Total number of requests')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--mix', type=str, default=DEFAULT_MIX, help=f'Operation weights. Default: {DEFAULT_MIX}')
+        parser.add_argument(
+            '--users', type=int, default=20,
+            help='Also the number of projects. Use with --mix members_picker=1 to benchmark large projects',
+        )
+        parser.add_argument('--members-per-project', type=int, default=10)
+        parser.add_argument('--questionnaires-per-project', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database after the benchmark')
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help='Delete the existing test database without asking',
+        )
+
+    def seed(self, options):
+        users = UserFactory.create_batch(options['users'])
+        projects = []
+        for user in users:
+            project = ProjectFactory.create(created_by=user, modified_by=user)
+            project.add_member(user, role=ProjectMembership.Role.ADMIN)
+            for member in random.sample(users, min(options['members_per_project'], len(users))):
+                if member != user:
+                    project.add_member(member, added_by=user)
+            QuestionnaireFactory.create_batch(
+                options['questionnaires_per_project'],
+                project=project,
+                created_by=user,
+                modified_by=user,
+            )
+            projects.append(project)
+        return users, projects
+
+    def get_operations(self, user, project):
+        memberships = list(
+            ProjectMembership.objects.filter(project=project).exclude(member=user).values_list('id', 'member_id')
+        )
+
+        def update_memberships_variables():
+            membership_id, member_id = random.choice(memberships)
+            return {
+                'projectId': str(project.pk),
+                'items': [{
+                    'id': str(membership_id),
+                    'clientId': f'benchmark-{membership_id}',
+                    'member': str(member_id),
+                    'role': random.choice(['ADMIN', 'MEMBER']),
+                }],
+            }
+
+        return {
+            'projects': (Query.PROJECTS, lambda: {}, True),
+            'questionnaires': (
+                Query.PROJECT_SCOPE_QUESTIONNAIRES,
+                lambda: {'projectId': str(project.pk)},
+                True,
+            ),
+            'update_memberships': (Query.UPDATE_MEMBERSHIPS, update_memberships_variables, True),
+            'members_picker': (
+                Query.MEMBERS_PICKER,
+                lambda: {'projectId': str(project.pk), 'search': random.choice(MEMBERS_PICKER_SEARCHES)},
+                True,
+            ),
+            'login': (
+                Query.LOGIN,
+                lambda: {'data': {'email': user.email, 'password': user.password_text}},
+                False,  # Anonymous client
+            ),
+        }
+
+    async def run_request(self, client, operation_name, query, variables, stats):
+        counter = {'count': 0}
+        current_query_counter.set(counter)
+        start = time.perf_counter()
+        response = await client.post(
+            '/graphql/',
+            data={'query': query, 'variables': variables},
+            content_type='application/json',
+        )
+        duration = time.perf_counter() - start
+        has_errors = response.status_code != 200 or 'errors' in response.json()
+        stats[operation_name].append((duration, counter['count'], has_errors))
+
+    async def run_benchmark(self, workers, mix, total_requests, concurrency):
+        stats = defaultdict(list)
+        queue = asyncio.Queue()
+        operation_names = random.choices(list(mix.keys()), weights=list(mix.values()), k=total_requests)
+        for operation_name in operation_names:
+            queue.put_nowait(operation_name)
+
+        # NOTE: Sync code (DB) runs in a single thread (thread_sensitive), install wrapper there
+        await sync_to_async(lambda: connection.execute_wrappers.append(count_queries_wrapper))()
+
+        async def _worker(index):
+            client, anonymous_client, operations = workers[index % len(workers)]
+            while not queue.empty():
+                operation_name = queue.get_nowait()
+                query, get_variables, authenticated = operations[operation_name]
+                await self.run_request(
+                    client if authenticated else anonymous_client,
+                    operation_name,
+                    query,
+                    get_variables(),
+                    stats,
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(*[_worker(index) for index in range(concurrency)])
+        duration = time.perf_counter() - start
+
+        @sync_to_async
+        def _cleanup():
+            connection.execute_wrappers.remove(count_queries_wrapper)
+            connection.close()
+
+        await _cleanup()
+        return duration, stats
+
+    def get_report(self, duration, stats, options, mix):
+        def _operation_report(items):
+            latencies = sorted(latency * 1000 for latency, _, _ in items)
+            queries = [query_count for _, query_count, _ in items]
+            return {
+                'count': len(items),
+                'errors': sum(1 for *_, has_errors in items if has_errors),
+                'throughput_rps': round(len(items) / duration, 2),
+                'latency_ms': {
+                    'mean': round(statistics.fmean(latencies), 2),
+                    'p50': round(get_percentile(latencies, 50), 2),
+                    'p95': round(get_percentile(latencies, 95), 2),
+                    'p99': round(get_percentile(latencies, 99), 2),
+                    'max': round(latencies[-1], 2),
+                },
+                'sql_queries': {
+                    'mean': round(statistics.fmean(queries), 2),
+                    'max': max(queries),
+                },
+            }
+
+        all_items = [item for items in stats.values() for item in items]
+        return {
+            'config': {
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'mix': mix,
+                'users': options['users'],
+                'members_per_project': options['members_per_project'],
+                'questionnaires_per_project': options['questionnaires_per_project'],
+                'seed': options['seed'],
+            },
+            'duration_s': round(duration, 3),
+            'total': _operation_report(all_items),
+            'operations': {
+                operation_name: _operation_report(items)
+                for operation_name, items in sorted(stats.items())
+            },
+            # Empty if pool is not enabled (DJANGO_DB_POOL_MAX_SIZE)
+            'db_pools': get_pools_stats(),
+        }
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        if unknown_operations := set(mix.keys()) - set(OPERATION_NAMES):
+            raise CommandError(f'Unknown operations in mix: {unknown_operations}')
+        random.seed(options['seed'])
+
+        # Use a separate database to not mess with the existing data
+        old_database_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=not options['interactive'],
+            keepdb=options['keepdb'],
+        )
+        try:
+            users, projects = self.seed(options)
+            workers = []
+            for user, project in zip(users, projects):
+                client = AsyncClient()
+                client.force_login(user)
+                workers.append((client, AsyncClient(), self.get_operations(user, project)))
+            # Release the main thread connection, requests uses their own thread
+            connection.close()
+
+            duration, stats = asyncio.run(
+                self.run_benchmark(workers, mix, options['requests'], options['concurrency'])
+            )
+            self.stdout.write(json.dumps(self.get_report(duration, stats, options, mix), indent=2))
+        finally:
+            connection.close()
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=options['keepdb'])
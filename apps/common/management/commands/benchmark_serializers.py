@@ -0,0 +1,104 @@
+import time
+import types
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import serializers
+
+from apps.user.models import User
+from apps.project.models import Project, ProjectMembership
+from apps.project.serializers import ProjectSerializer, ProjectMembershipBulkSerializer
+from apps.questionnaire.serializers import QuestionnaireSerializer
+
+
+def get_uncached_fields_serializer_class(serializer_class):
+    """
+    Same serializer with DRF default behaviour (fields/validators are built for each instance)
+    """
+    return type(
+        serializer_class.__name__,
+        (serializer_class,),
+        {
+            'get_fields': serializers.ModelSerializer.get_fields,
+            'get_validators': serializers.ModelSerializer.get_validators,
+        },
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark validation throughput of ModelMutation serializers for bulk payloads (Changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    @staticmethod
+    def run_validation(serializer_class, payload, context) -> float:
+        start = time.perf_counter()
+        for data in payload:
+            serializer = serializer_class(data=data, context=context)
+            assert serializer.is_valid(), serializer.errors
+        return time.perf_counter() - start
+
+    def benchmark(self, serializer_class, payload, context, repeat):
+        self.stdout.write(f'{serializer_class.__name__} ({len(payload)} items)')
+        results = {}
+        for label, _serializer_class in [
+            ('default', get_uncached_fields_serializer_class(serializer_class)),
+            ('cached-fields', serializer_class),
+        ]:
+            best_duration = min(
+                self.run_validation(_serializer_class, payload, context)
+                for _ in range(repeat)
+            )
+            results[label] = best_duration
+            self.stdout.write(
+                f'  - {label:<15} {best_duration * 1000:>10.2f}ms {len(payload) / best_duration:>12.2f} items/sec'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'  Speedup: {results["default"] / results["cached-fields"]:.2f}x')
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        items_count = options['items']
+        repeat = options['repeat']
+
+        user = User.objects.create_user(email='benchmark-serializers@example.com', password=None)
+        project = Project.objects.create(title='Benchmark', created_by=user, modified_by=user)
+        members = User.objects.bulk_create([
+            User(email=f'benchmark-serializers-{i}@example.com')
+            for i in range(items_count)
+        ])
+        context = {
+            'request': types.SimpleNamespace(user=user),
+            'active_project': types.SimpleNamespace(project=project),
+        }
+
+        self.benchmark(
+            ProjectSerializer,
+            [{'title': f'Project {i}'} for i in range(items_count)],
+            context,
+            repeat,
+        )
+        self.benchmark(
+            QuestionnaireSerializer,
+            [{'title': f'Questionnaire {i}'} for i in range(items_count)],
+            context,
+            repeat,
+        )
+        self.benchmark(
+            ProjectMembershipBulkSerializer,
+            [
+                {
+                    'client_id': f'client-id-{member.pk}',
+                    'member': member.pk,
+                    'role': ProjectMembership.Role.MEMBER,
+                }
+                for member in members
+            ],
+            context,
+            repeat,
+        )
+        # Nothing should be saved
+        transaction.set_rollback(True)
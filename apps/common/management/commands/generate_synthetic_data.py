@@ -0,0 +1,226 @@
+import heapq
+import itertools
+import random
+import time
+from array import array
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.user.models import User
+from apps.project.models import Project, ProjectMembership
+from apps.questionnaire.models import Questionnaire
+
+
+FIRST_NAMES = ('Aarav', 'Bikash', 'Chloe', 'Diego', 'Emma', 'Fatima', 'Gita', 'Hiro', 'Ines', 'Jonas', 'Kiran', 'Lena')
+LAST_NAMES = ('Adhikari', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Gurung', 'Haddad', 'Ito', 'Jensen', 'Khan')
+
+DISTRIBUTIONS = ('fixed', 'uniform', 'pareto')
+# Shape used for the pareto distribution (Lower value -> Longer tail)
+PARETO_ALPHA = 1.5
+# Weighted sampling: Draw with replacement (rejecting duplicates) while the sample is a small fraction of the users
+REJECTION_SAMPLING_MAX_FRACTION = 0.1
+
+
+def get_batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic data (users, projects, memberships, questionnaires) using bulk_create.'
+        ' Same seed generates same dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--projects', type=int, default=1_000)
+        parser.add_argument('--members-per-project', type=int, default=50, help='Mean members per project')
+        parser.add_argument('--questionnaires-per-project', type=int, default=10, help='Mean questionnaires per project')
+        parser.add_argument(
+            '--distribution',
+            choices=DISTRIBUTIONS,
+            default='pareto',
+            help='Distribution for members per project/questionnaires per project and projects per user',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--password', type=str, default='password', help='Shared password for all the users')
+        parser.add_argument('--force', action='store_true', help='Allow running with DEBUG=False')
+
+    # Helpers
+    def sample_count(self, mean: int, maximum: int) -> int:
+        if self.distribution == 'fixed':
+            value = mean
+        elif self.distribution == 'uniform':
+            value = self.rng.randint(0, 2 * mean)
+        else:  # pareto: mean of paretovariate is alpha / (alpha - 1)
+            value = round(mean * self.rng.paretovariate(PARETO_ALPHA) * (PARETO_ALPHA - 1) / PARETO_ALPHA)
+        return min(value, maximum)
+
+    def get_user_weights(self, users_count: int) -> list[float] | None:
+        """
+        Weights used to select users for projects/memberships (projects per user)
+        """
+        if self.distribution != 'pareto':
+            return None
+        return [
+            self.rng.paretovariate(PARETO_ALPHA)
+            for _ in range(users_count)
+        ]
+
+    def sample_users(
+        self,
+        user_ids: array,
+        cum_weights: list[float] | None,
+        inverse_weights: list[float] | None,
+        count: int,
+    ) -> set[int]:
+        if cum_weights is None:
+            return set(self.rng.sample(user_ids, count))
+        if count <= len(user_ids) * REJECTION_SAMPLING_MAX_FRACTION:
+            # O(count * log(users)): Duplicates are rare for small samples
+            sampled_user_ids = set()
+            while len(sampled_user_ids) < count:
+                sampled_user_ids.update(
+                    self.rng.choices(user_ids, cum_weights=cum_weights, k=count - len(sampled_user_ids))
+                )
+            return sampled_user_ids
+        # O(users): Weighted sampling without replacement (Efraimidis-Spirakis)
+        # Top `count` users using random() ** (1 / weight)
+        # NOTE: Rejection sampling doesn't finish when count is close to users count
+        random_value = self.rng.random
+        return {
+            user_id
+            for _, user_id in heapq.nlargest(
+                count,
+                zip(
+                    (random_value() ** inverse_weight for inverse_weight in inverse_weights),
+                    user_ids,
+                ),
+            )
+        }
+
+    def log(self, message, start):
+        self.stdout.write(f'{message} ({time.perf_counter() - start:.2f}s)')
+
+    # Generators
+    def generate_users(self, users_count):
+        # Hashing is the slowest part of creating users, so using same precomputed hash for all users
+        password_hash = make_password(self.password)
+        user_ids = array('q')
+        for batch in get_batches(range(users_count), self.batch_size):
+            users = User.objects.bulk_create([
+                User(
+                    email=f'synthetic-{self.seed}-{index}@example.com',
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    password=password_hash,
+                )
+                for index in batch
+            ])
+            user_ids.extend(user.pk for user in users)
+        return user_ids
+
+    def generate_projects(self, projects_count, user_ids, user_weights):
+        user_cum_weights = user_weights and list(itertools.accumulate(user_weights))
+        project_ids_with_owner = []
+        for batch in get_batches(range(projects_count), self.batch_size):
+            owners = self.rng.choices(user_ids, cum_weights=user_cum_weights, k=len(batch))
+            projects = Project.objects.bulk_create([
+                Project(
+                    title=f'Synthetic Project {self.seed}-{index}',
+                    created_by_id=owner,
+                    modified_by_id=owner,
+                )
+                for index, owner in zip(batch, owners)
+            ])
+            project_ids_with_owner.extend((project.pk, project.created_by_id) for project in projects)
+            Project.update_search_vectors(Project.objects.filter(pk__in=[project.pk for project in projects]))
+        return project_ids_with_owner
+
+    def generate_memberships(self, project_ids_with_owner, user_ids, user_weights, members_per_project):
+        user_cum_weights = user_weights and list(itertools.accumulate(user_weights))
+        user_inverse_weights = user_weights and [1 / weight for weight in user_weights]
+
+        def _memberships():
+            for project_id, owner_id in project_ids_with_owner:
+                yield ProjectMembership(
+                    project_id=project_id,
+                    member_id=owner_id,
+                    role=ProjectMembership.Role.ADMIN,
+                )
+                members_count = self.sample_count(members_per_project, len(user_ids) - 1)
+                for member_id in self.sample_users(
+                    user_ids, user_cum_weights, user_inverse_weights, members_count,
+                ) - {owner_id}:
+                    yield ProjectMembership(
+                        project_id=project_id,
+                        member_id=member_id,
+                        role=ProjectMembership.Role.MEMBER,
+                        added_by_id=owner_id,
+                    )
+
+        total = 0
+        for batch in get_batches(_memberships(), self.batch_size):
+            ProjectMembership.objects.bulk_create(batch)
+            total += len(batch)
+        return total
+
+    def generate_questionnaires(self, project_ids_with_owner, questionnaires_per_project):
+        def _questionnaires():
+            for project_id, owner_id in project_ids_with_owner:
+                for index in range(self.sample_count(questionnaires_per_project, 10 * questionnaires_per_project)):
+                    yield Questionnaire(
+                        title=f'Synthetic Questionnaire {project_id}-{index}',
+                        project_id=project_id,
+                        created_by_id=owner_id,
+                        modified_by_id=owner_id,
+                    )
+
+        total = 0
+        for batch in get_batches(_questionnaires(), self.batch_size):
+            questionnaires = Questionnaire.objects.bulk_create(batch)
+            Questionnaire.update_search_vectors(
+                Questionnaire.objects.filter(pk__in=[questionnaire.pk for questionnaire in questionnaires])
+            )
+            total += len(batch)
+        return total
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('This will add lots of data. Use --force to run with DEBUG=False')
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.distribution = options['distribution']
+        self.batch_size = options['batch_size']
+        self.password = options['password']
+
+        if User.objects.filter(email=f'synthetic-{self.seed}-0@example.com').exists():
+            raise CommandError(f'Synthetic data already exists for seed: {self.seed}. Use different seed.')
+
+        start = time.perf_counter()
+        user_ids = self.generate_users(options['users'])
+        self.log(f'Users: {len(user_ids)}', start)
+
+        user_weights = self.get_user_weights(len(user_ids))
+        project_ids_with_owner = self.generate_projects(options['projects'], user_ids, user_weights)
+        self.log(f'Projects: {len(project_ids_with_owner)}', start)
+
+        memberships_count = self.generate_memberships(
+            project_ids_with_owner,
+            user_ids,
+            user_weights,
+            options['members_per_project'],
+        )
+        self.log(f'Memberships: {memberships_count}', start)
+
+        questionnaires_count = self.generate_questionnaires(
+            project_ids_with_owner,
+            options['questionnaires_per_project'],
+        )
+        self.log(f'Questionnaires: {questionnaires_count}', start)
+        self.stdout.write(self.style.SUCCESS('Done'))
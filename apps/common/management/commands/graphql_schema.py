@@ -1,23 +1,62 @@
-import argparse
-from django.core.management.base import BaseCommand
+import json
+from django.core.management.base import BaseCommand, CommandError
 from strawberry.printer import print_schema
+
 from main.graphql.schema import schema
+from main.graphql.artifact import generate_schema_artifact, load_schema_artifact, get_stale_types
 
 
 class Command(BaseCommand):
-    help = 'Create schema.graphql file'
+    help = 'Create schema.graphql file (and optional schema artifact)'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--out',
-            type=argparse.FileType('w'),
+            type=str,
             default='schema.graphql',
         )
+        parser.add_argument(
+            '--artifact',
+            type=str,
+            help='Path for the JSON schema artifact (SDL + type map + hash)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Don't write, only fail if the existing files are stale",
+        )
+
+    def check_files(self, out, artifact_path):
+        errors = []
+        try:
+            with open(out) as fp:
+                if fp.read() != print_schema(schema):
+                    errors.append(f'{out} is not up to date')
+        except FileNotFoundError:
+            errors.append(f'Schema file missing: {out}')
+        if artifact_path:
+            try:
+                artifact = load_schema_artifact(artifact_path)
+            except FileNotFoundError:
+                errors.append(f'Schema artifact file missing: {artifact_path}')
+            else:
+                if stale_types := get_stale_types(schema, artifact):
+                    errors.append(f'{artifact_path} is not up to date. Stale types: {", ".join(stale_types)}')
+        if errors:
+            raise CommandError('\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS('Schema files are up to date'))
 
     def handle(self, *args, **options):
-        file = options['out']
-        file.write(
-            print_schema(schema)
-        )
-        file.close()
-        self.stdout.write(self.style.SUCCESS(f'{file.name} file generated'))
+        out = options['out']
+        artifact_path = options['artifact']
+        if options['check']:
+            return self.check_files(out, artifact_path)
+
+        with open(out, 'w') as fp:
+            fp.write(print_schema(schema))
+        self.stdout.write(self.style.SUCCESS(f'{out} file generated'))
+
+        if artifact_path:
+            with open(artifact_path, 'w') as fp:
+                json.dump(generate_schema_artifact(schema), fp, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'{artifact_path} file generated'))
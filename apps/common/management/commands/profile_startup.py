@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+# NOTE: Runs in a fresh python process, so that nothing is already imported/cached
+PROFILE_SCRIPT = '''
+import json
+import time
+
+import django
+
+start = time.perf_counter()
+django.setup()
+django_setup_time = time.perf_counter() - start
+
+start = time.perf_counter()
+import main.graphql.schema  # noqa: E402
+schema_import_time = time.perf_counter() - start
+
+import strawberry  # noqa: E402
+from main.graphql.schema import Query, Mutation  # noqa: E402
+
+start = time.perf_counter()
+strawberry.Schema(query=Query, mutation=Mutation)
+schema_build_time = time.perf_counter() - start
+
+print(json.dumps({
+    'django_setup': django_setup_time,
+    'schema_import': schema_import_time,
+    'schema_build': schema_build_time,
+}))
+'''
+
+
+def parse_import_time(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    Parse output of python -X importtime
+    Returns list of (module, self time [us], cumulative time [us])
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_time, cumulative_time, module = line[len('import time:'):].split('|')
+            modules.append((module.strip(), int(self_time), int(cumulative_time)))
+        except ValueError:  # Header line
+            continue
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Report import time per module and GraphQL schema build time for a fresh worker process'
+    # Checks will import the urls (and the schema)
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='Number of slowest modules to show')
+        parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT],
+            capture_output=True,
+            text=True,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'main.settings'),
+            },
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr)
+
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = parse_import_time(result.stderr)
+        top_level_modules = sorted(
+            (
+                (module, cumulative_time)
+                for module, _, cumulative_time in modules
+                if '.' not in module
+            ),
+            key=lambda item: -item[1],
+        )[:options['top']]
+        slowest_modules = sorted(modules, key=lambda item: -item[1])[:options['top']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                **timings,
+                'top_level_packages': [
+                    {'module': module, 'cumulative_us': cumulative_time}
+                    for module, cumulative_time in top_level_modules
+                ],
+                'modules': [
+                    {'module': module, 'self_us': self_time, 'cumulative_us': cumulative_time}
+                    for module, self_time, cumulative_time in slowest_modules
+                ],
+            }, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Startup'))
+        for key, value in timings.items():
+            self.stdout.write(f'  {key:<20} {value * 1000:>10.2f}ms')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Top-level packages (cumulative import time)'))
+        for module, cumulative_time in top_level_modules:
+            self.stdout.write(f'  {cumulative_time / 1000:>10.2f}ms  {module}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Slowest modules (self import time)'))
+        for module, self_time, cumulative_time in slowest_modules:
+            self.stdout.write(f'  {self_time / 1000:>10.2f}ms {cumulative_time / 1000:>10.2f}ms  {module}')
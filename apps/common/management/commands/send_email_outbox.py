@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from utils.email import send_email_outbox_batch, flush_email_digests, prune_email_outbox
+
+# Seconds, old sent emails are deleted with this interval
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker: Send pending emails from the outbox in batches (with retries and backoff) and due digests.'
+        ' Old sent emails are pruned periodically.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+        parser.add_argument('--sleep', type=float, default=5, help='Seconds to wait when the outbox is empty')
+
+    def drain(self, batch_size):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_email_outbox_batch(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                return total_sent, total_failed
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pruned_at = None
+        while True:
+            if last_pruned_at is None or time.monotonic() - last_pruned_at >= PRUNE_INTERVAL:
+                if pruned := prune_email_outbox():
+                    self.stdout.write(f'Sent emails pruned: {pruned}')
+                last_pruned_at = time.monotonic()
+            if digests := flush_email_digests():
+                self.stdout.write(f'Digest emails enqueued: {digests}')
+            sent, failed = self.drain(batch_size)
+            if sent or failed:
+                self.stdout.write(f'Emails sent: {sent}, failed: {failed}')
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
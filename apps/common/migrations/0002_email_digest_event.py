@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:34
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0001_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDigestEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_type', models.PositiveSmallIntegerField(choices=[(1, 'Account Activation'), (2, 'Password Reset'), (3, 'Password Changed'), (4, 'News And Offers')])),
+                ('subject', models.CharField(max_length=255)),
+                ('email_html_template_name', models.CharField(max_length=255)),
+                ('email_text_template_name', models.CharField(max_length=255)),
+                ('context', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'email_type', 'created_at'], name='common_emai_user_id_e4fb0a_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
-from apps.user.models import User
+from django.contrib.postgres.search import SearchVectorField, SearchVector, SearchQuery, SearchRank
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.user.models import User, EmailNotificationType
 
 
 class UserResource(models.Model):
@@ -15,6 +19,8 @@ class UserResource(models.Model):
         related_name='%(class)s_modified',
         on_delete=models.PROTECT,
     )
+    # Used for optimistic concurrency control
+    version = models.PositiveIntegerField(default=1)
 
     # Typing
     id: int
@@ -23,3 +29,139 @@ class UserResource(models.Model):
     class Meta:
         abstract = True
         ordering = ['-id']
+
+    class VersionConflict(Exception):
+        pass
+
+    def bump_version(self, expected_version: int):
+        """
+        Conditional write: UPDATE ... SET version = version + 1 WHERE id = ? AND version = ?
+        NOTE: Should be called within transaction.atomic, the row is locked until commit.
+        """
+        updated_rows = type(self).objects\
+            .filter(pk=self.pk, version=expected_version)\
+            .update(version=models.F('version') + 1)
+        if not updated_rows:
+            raise self.VersionConflict(
+                f'{type(self).__name__}({self.pk}) was modified by someone else. Expected version: {expected_version}'
+            )
+        self.version = expected_version + 1
+
+
+class SearchVectorModel(models.Model):
+    """
+    Stored full-text search vector for SEARCH_VECTOR_FIELDS, updated on save
+    NOTE: Define GinIndex for search_vector in the child models
+    """
+    SEARCH_CONFIG = 'simple'  # Titles are not only in english, so no stemming/stop words
+    SEARCH_VECTOR_FIELDS: tuple[str, ...]
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def update_search_vectors(cls, queryset=None):
+        """
+        Use this after bulk_create/update, which doesn't call save
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        return queryset.update(
+            search_vector=SearchVector(*cls.SEARCH_VECTOR_FIELDS, config=cls.SEARCH_CONFIG),
+        )
+
+    @classmethod
+    def full_text_search(cls, queryset, value: str):
+        """
+        Filter and order by the relevance (search_rank)
+        """
+        query = SearchQuery(value, config=cls.SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(models.F('search_vector'), query),
+        ).order_by('-search_rank', '-id')
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or set(update_fields) & set(self.SEARCH_VECTOR_FIELDS):
+            # NOTE: Using values instead of the columns to update it using the same INSERT/UPDATE query
+            self.search_vector = SearchVector(
+                *[
+                    models.Value(getattr(self, field), output_field=models.TextField())
+                    for field in self.SEARCH_VECTOR_FIELDS
+                ],
+                config=self.SEARCH_CONFIG,
+            )
+            if update_fields is not None:
+                update_fields = {*update_fields, 'search_vector'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+        # Expression is not valid after save, fetch from the database if used
+        self.__dict__.pop('search_vector', None)
+
+
+class EmailOutbox(models.Model):
+    """
+    Emails are enqueued here by utils.email.send_email and sent by the worker (./manage.py send_email_outbox)
+    NOTE: Context can have secrets (eg: password reset link), cleared once SENT/FAILED.
+          SENT emails are deleted after EMAIL_OUTBOX_SENT_RETENTION (See utils.email.prune_email_outbox)
+    """
+    class Status(models.IntegerChoices):
+        PENDING = 0, 'Pending'
+        SENT = 1, 'Sent'
+        FAILED = 2, 'Failed'  # Max attempts reached
+        SENDING = 3, 'Sending'  # Claimed by a worker, picked again after EMAIL_OUTBOX_SENDING_TIMEOUT
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    email_type = models.PositiveSmallIntegerField(choices=EmailNotificationType.choices)
+    subject = models.CharField(max_length=255)
+    email_html_template_name = models.CharField(max_length=255)
+    email_text_template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    user_id: int
+
+    class Meta:
+        indexes = [
+            # Used by the worker to fetch pending emails
+            models.Index(
+                fields=('next_attempt_at',),
+                condition=models.Q(status__in=[0, 3]),
+                name='email_outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_email_type_display()} -> {self.user_id} ({self.get_status_display()})'
+
+
+class EmailDigestEvent(models.Model):
+    """
+    Follow-ups of digestible notifications (EmailNotificationType.get_digestible) within EMAIL_DIGEST_WINDOW
+    are recorded here by utils.email.send_email and coalesced into a single email per user/type after
+    EMAIL_DIGEST_WINDOW (See utils.email.flush_email_digests)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    email_type = models.PositiveSmallIntegerField(choices=EmailNotificationType.choices)
+    subject = models.CharField(max_length=255)
+    email_html_template_name = models.CharField(max_length=255)
+    email_text_template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    user_id: int
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('user', 'email_type', 'created_at')),
+        ]
+
+    def __str__(self):
+        return f'{self.get_email_type_display()} -> {self.user_id}'
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from main.graphql.response_cache import Generation, bump_generations
+from main.graphql.extensions import install_sql_stats_wrapper, install_thread_hops_counter
+from apps.user.models import User
+from apps.project.models import Project, ProjectMembership
+from apps.questionnaire.models import Questionnaire
+
+
+def bump_generations_on_commit(*names):
+    # NOTE: Bumped after commit, cached responses before that are using the old data
+    # NOTE: QuerySet.update(), bulk_create() and bulk_update() don't send post_save/post_delete,
+    #       call bump_generations manually for those writes
+    transaction.on_commit(lambda: bump_generations(names))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(instance, update_fields=None, **_):
+    # last_login is changed for each login, which is not used by the responses
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    # Members list of the user's projects
+    project_ids = ProjectMembership.objects.filter(member=instance.pk).values_list('project_id', flat=True)
+    bump_generations_on_commit(
+        Generation.USER,
+        Generation.user(instance.pk),
+        *[Generation.project(project_id) for project_id in project_ids],
+    )
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(instance, **_):
+    bump_generations_on_commit(Generation.project(instance.pk))
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def project_membership_changed(instance, **_):
+    bump_generations_on_commit(Generation.project(instance.project_id), Generation.user(instance.member_id))
+
+
+@receiver(post_save, sender=Questionnaire)
+@receiver(post_delete, sender=Questionnaire)
+def questionnaire_changed(instance, **_):
+    bump_generations_on_commit(Generation.project(instance.project_id))
+
+
+# GraphQL operation instrumentation (See main.graphql.extensions)
+if settings.GRAPHQL_INSTRUMENTATION:
+    connection_created.connect(install_sql_stats_wrapper, dispatch_uid='install_sql_stats_wrapper')
+    install_thread_hops_counter()
@@ -1,7 +1,7 @@
 from django.utils.functional import cached_property
 from rest_framework import serializers
 
-from main.caches import local_cache, CacheKey
+from apps.common.models import UserResource
 
 
 class ProjectScopeSerializerMixin(serializers.Serializer):
@@ -29,7 +29,16 @@ class UserResourceSerializer(ProjectScopeSerializerMixin, serializers.ModelSeria
         read_only=True)
 
     client_id = serializers.CharField(required=False)
-    version_id = serializers.SerializerMethodField()
+    # Expected version for the update, current version is used if not provided
+    version_id = serializers.IntegerField(required=False, write_only=True)
+
+    # Not included in the create input type (See ModelMutation.InputType)
+    update_only_fields = ('version_id',)
+
+    def validate_version_id(self, version_id):
+        if self.instance is None:
+            raise serializers.ValidationError('versionId is only allowed for the updates')
+        return version_id
 
     def create(self, validated_data):
         if 'project' in self.Meta.model._meta._forward_fields_map:
@@ -41,10 +50,16 @@ class UserResourceSerializer(ProjectScopeSerializerMixin, serializers.ModelSeria
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
+        version_id = validated_data.pop('version_id', None)
         if 'project' in self.Meta.model._meta._forward_fields_map:
             self.project  # Just for validation
         if 'modified_by' in self.Meta.model._meta._forward_fields_map:
             validated_data['modified_by'] = self.context['request'].user
+        if isinstance(instance, UserResource):
+            # Raises UserResource.VersionConflict if the row was modified after expected version
+            instance.bump_version(
+                instance.version if version_id is None else version_id
+            )
         return super().update(instance, validated_data)
 
 
@@ -54,26 +69,22 @@ class TempClientIdMixin(serializers.ModelSerializer):
     """
     client_id = serializers.CharField(required=False)
 
-    @staticmethod
-    def get_cache_key(instance, request):
-        return CacheKey.TEMP_CLIENT_ID_KEY_FORMAT.format(
-            request_hash=hash(request),
-            instance_type=type(instance).__name__,
-            instance_id=instance.pk,
-        )
+    def set_temp_client_id(self, instance, temp_client_id):
+        instance.client_id = temp_client_id
+        # Used by ClientIdMixin for the instances fetched again in the same request
+        if graphql_info := self.context.get('graphql_info'):
+            graphql_info.context.set_temp_client_id(instance, temp_client_id)
 
     def create(self, validated_data):
         temp_client_id = validated_data.pop('client_id', None)
         instance = super().create(validated_data)
         if temp_client_id:
-            instance.client_id = temp_client_id
-            local_cache.set(self.get_cache_key(instance, self.context['request']), temp_client_id, 60)
+            self.set_temp_client_id(instance, temp_client_id)
         return instance
 
     def update(self, instance, validated_data):
         temp_client_id = validated_data.pop('client_id', None)
         instance = super().update(instance, validated_data)
         if temp_client_id:
-            instance.client_id = temp_client_id
-            local_cache.set(self.get_cache_key(instance, self.context['request']), temp_client_id, 60)
+            self.set_temp_client_id(instance, temp_client_id)
         return instance
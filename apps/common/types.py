@@ -2,8 +2,6 @@ import strawberry
 import datetime
 from strawberry.types import Info
 
-from main.caches import local_cache
-from apps.common.serializers import TempClientIdMixin
 from apps.user.types import UserType
 
 
@@ -15,7 +13,7 @@ class ClientIdMixin:
         # NOTE: We should always provide non-null client_id
         return (
             getattr(self, 'client_id', None) or
-            local_cache.get(TempClientIdMixin.get_cache_key(self, info.context.request)) or
+            info.context.get_temp_client_id(self) or
             str(self.id)
         )
 
@@ -24,6 +22,10 @@ class UserResourceTypeMixin:
     created_at: datetime.datetime
     modified_at: datetime.datetime
 
+    @strawberry.field
+    def version_id(self) -> int:
+        return self.version
+
     @strawberry.field
     def created_by(self, info: Info) -> UserType:
         return info.context.dl.user.load_users.load(self.created_by_id)
@@ -0,0 +1,23 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+
+from utils.db_backends.postgresql_pool.pool import get_pools_stats
+
+
+@staff_member_required
+def db_pool_stats(request) -> JsonResponse:
+    """
+    Connection pool metrics for this process (Pool is enabled using DJANGO_DB_POOL_MAX_SIZE)
+    """
+    return JsonResponse({
+        'databases': {
+            alias: {
+                'engine': connections.settings[alias]['ENGINE'],
+                'conn_max_age': connections.settings[alias]['CONN_MAX_AGE'],
+                'conn_health_checks': connections.settings[alias]['CONN_HEALTH_CHECKS'],
+            }
+            for alias in connections
+        },
+        'pools': get_pools_stats(),
+    })
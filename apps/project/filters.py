@@ -1,6 +1,7 @@
 import strawberry
 import strawberry_django
-from django.db import models
+
+from apps.user.filters import filter_users_by_search
 
 from .models import Project, ProjectMembership
 
@@ -9,14 +10,21 @@ from .models import Project, ProjectMembership
 class ProjectFilter:
     id: strawberry.auto
     search: str | None
+    full_text_search: str | None
 
     def filter_search(self, queryset):
         if self.search:
             queryset = queryset.filter(
-                title__icontains=self.search,
+                title__ilike_contains=self.search,
             )
         return queryset
 
+    def filter_full_text_search(self, queryset):
+        # NOTE: Ordered by relevance, unless order is provided
+        if self.full_text_search:
+            queryset = Project.full_text_search(queryset, self.full_text_search)
+        return queryset
+
 
 @strawberry_django.filters.filter(ProjectMembership, lookups=True)
 class ProjectMembershipFilter:
@@ -25,9 +33,5 @@ class ProjectMembershipFilter:
 
     def filter_search(self, queryset):
         if self.search:
-            queryset = queryset.filter(
-                models.Q(member__email__icontains=self.search) |
-                models.Q(member__first_name__icontains=self.search) |
-                models.Q(member__last_name__icontains=self.search)
-            )
+            queryset = filter_users_by_search(queryset, self.search, prefix='member__')
         return queryset
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectmembership',
+            index=models.Index(fields=['project', 'member'], include=('role',), name='membership_project_member_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmembership',
+            index=models.Index(fields=['project', 'joined_at', 'id'], name='membership_project_joined_idx'),
+        ),
+        # Single column FK index is covered by the composite indexes
+        # NOTE: AlterField would also drop and re-create (validate) the FK constraint, so only dropping the index
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='projectmembership',
+                    name='project',
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='project.project',
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX IF EXISTS "project_projectmembership_project_id_266cce82"',
+                    reverse_sql=(
+                        'CREATE INDEX "project_projectmembership_project_id_266cce82"'
+                        ' ON "project_projectmembership" ("project_id")'
+                    ),
+                ),
+            ],
+        ),
+    ]
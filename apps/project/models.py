@@ -1,8 +1,9 @@
 from enum import Enum, auto, unique
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 
 from utils.common import get_queryset_for_model
-from apps.common.models import UserResource
+from apps.common.models import UserResource, SearchVectorModel
 from apps.user.models import User
 
 
@@ -12,7 +13,8 @@ class ProjectMembership(models.Model):
         MEMBER = 1, 'Member'
 
     member = models.ForeignKey(User, on_delete=models.CASCADE)
-    project = models.ForeignKey('project.Project', on_delete=models.CASCADE)
+    # NOTE: Indexed using the composite indexes (See Meta.indexes)
+    project = models.ForeignKey('project.Project', on_delete=models.CASCADE, db_index=False)
     role = models.PositiveSmallIntegerField(choices=Role.choices, default=Role.MEMBER)
 
     joined_at = models.DateTimeField(auto_now_add=True)
@@ -31,12 +33,20 @@ class ProjectMembership(models.Model):
 
     class Meta:
         unique_together = ('member', 'project')
+        indexes = [
+            # Permissions/current user role (project + member -> role) and members exclude (NOT EXISTS)
+            models.Index(fields=('project', 'member'), include=('role',), name='membership_project_member_idx'),
+            # Members listing (project -> ordered by joined_at/id)
+            models.Index(fields=('project', 'joined_at', 'id'), name='membership_project_joined_idx'),
+        ]
 
     def __str__(self):
         return '{} @ {}'.format(str(self.member), self.project.title)
 
 
-class Project(UserResource):
+class Project(UserResource, SearchVectorModel):
+    SEARCH_VECTOR_FIELDS = ('title',)
+
     title = models.CharField(max_length=255)
     members = models.ManyToManyField(
         User,
@@ -45,6 +55,14 @@ class Project(UserResource):
         through='ProjectMembership',
     )
 
+    class Meta(UserResource.Meta):
+        indexes = [
+            # Used by ProjectFilter.search (ilike_contains)
+            GinIndex(fields=('title',), name='project_title_trgm_idx', opclasses=('gin_trgm_ops',)),
+            # Used by ProjectFilter.full_text_search
+            GinIndex(fields=('search_vector',), name='project_search_idx'),
+        ]
+
     @unique
     class Permission(Enum):
         # Project
@@ -73,21 +91,28 @@ class Project(UserResource):
 
     def get_permissions_for_user(self, user: User):
         # XXX: N+1
-        membership = ProjectMembership.objects.filter(
-            member=user,
-            project=self,
-        ).first()
-        if membership:
-            return self.get_permissions.get(membership.role, [])
+        # NOTE: Not using first() (ORDER BY id), role is fetched using membership_project_member_idx (index-only)
+        role = next(
+            iter(
+                ProjectMembership.objects.filter(
+                    member=user,
+                    project=self,
+                ).values_list('role', flat=True)[:1]
+            ),
+            None,
+        )
+        if role is not None:
+            return self.get_permissions.get(role, [])
         return []
 
     @classmethod
     def get_for(cls, user, queryset=None):
+        # NOTE: (member, project) is unique, so no ORDER BY is needed (index-only using membership_project_member_idx)
         current_user_role_subquery = models.Subquery(
             ProjectMembership.objects.filter(
                 project=models.OuterRef('pk'),
                 member=user,
-            ).order_by('role').values('role')[:1],
+            ).values('role')[:1],
             output_field=models.CharField(),
         )
 
@@ -1,16 +1,17 @@
 from rest_framework import serializers
 
-from utils.strawberry.serializers import IntegerIDField
+from utils.strawberry.serializers import IntegerIDField, CachedFieldsSerializerMixin
 from apps.common.serializers import UserResourceSerializer, TempClientIdMixin
 
 from .models import Project, ProjectMembership
 
 
-class ProjectSerializer(UserResourceSerializer):
+class ProjectSerializer(CachedFieldsSerializerMixin, UserResourceSerializer):
     class Meta:
         model = Project
         fields = (
             'title',
+            'version_id',
         )
 
     def create(self, data):
@@ -24,7 +25,7 @@ class ProjectSerializer(UserResourceSerializer):
         return project
 
 
-class ProjectMembershipBulkSerializer(TempClientIdMixin, UserResourceSerializer):
+class ProjectMembershipBulkSerializer(CachedFieldsSerializerMixin, TempClientIdMixin, UserResourceSerializer):
     # NOTE: Required by ModelMutation
     id = IntegerIDField(required=False)
 
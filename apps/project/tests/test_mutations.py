@@ -1,4 +1,7 @@
+from unittest import mock
+
 from main.tests import TestCase
+from utils.strawberry.idempotency import CacheIdempotencyStore
 
 from apps.project.models import Project, ProjectMembership
 from apps.user.factories import UserFactory
@@ -128,6 +131,69 @@ class TestProjectMutation(TestCase):
         self.assertEqual(content_response['result']['id'], str(latest_project.id), content)
         self.assertEqual(content_response['result']['title'], latest_project.title, content)
 
+        # versionId is only for the updates
+        content = self.query_check(
+            self.Mutation.ProjectCreate,
+            variables={'data': {'title': 'Project 2', 'versionId': 1}},
+            assert_errors=True,
+        )
+        assert project_count + 1 == Project.objects.count()
+
+    def test_create_project_with_idempotency_key(self):
+        user = UserFactory.create()
+        self.force_login(user)
+
+        project_count = Project.objects.count()
+        variables = {'data': {'title': 'Project 1'}}
+        responses = [
+            self.query_check(self.Mutation.ProjectCreate, variables=variables, HTTP_IDEMPOTENCY_KEY=key)
+            for key in ['key-1', 'key-1', 'key-2']
+        ]
+        # Retry with same key is replayed
+        assert project_count + 2 == Project.objects.count()
+        assert responses[0] == responses[1]
+        assert responses[0] != responses[2]
+
+        # Keys are scoped per user
+        self.force_login(UserFactory.create())
+        self.query_check(self.Mutation.ProjectCreate, variables=variables, HTTP_IDEMPOTENCY_KEY='key-1')
+        assert project_count + 3 == Project.objects.count()
+
+        # Same key with a different payload is rejected
+        content = self.query_check(
+            self.Mutation.ProjectCreate,
+            variables={'data': {'title': 'Project 2'}},
+            HTTP_IDEMPOTENCY_KEY='key-1',
+            assert_errors=True,
+        )
+        assert 'different request' in content['errors'][0]['message']
+        assert project_count + 3 == Project.objects.count()
+
+        # Failed responses are not stored, retry (with fixed payload) is executed again
+        content = self.query_check(
+            self.Mutation.ProjectCreate,
+            variables={'data': {'title': ''}},
+            HTTP_IDEMPOTENCY_KEY='key-3',
+        )
+        assert content['data']['private']['createProject']['ok'] is False
+        content = self.query_check(self.Mutation.ProjectCreate, variables=variables, HTTP_IDEMPOTENCY_KEY='key-3')
+        assert content['data']['private']['createProject']['ok'] is True
+        assert project_count + 4 == Project.objects.count()
+
+        # Concurrent retry (key is reserved by the in-progress request) is rejected
+        with (
+            mock.patch.object(CacheIdempotencyStore, 'add', return_value=False),
+            mock.patch.object(CacheIdempotencyStore, 'get', return_value=('fingerprint', None)),
+        ):
+            content = self.query_check(
+                self.Mutation.ProjectCreate,
+                variables=variables,
+                HTTP_IDEMPOTENCY_KEY='key-4',
+                assert_errors=True,
+            )
+        assert 'in progress' in content['errors'][0]['message']
+        assert project_count + 4 == Project.objects.count()
+
     def test_update_project(self):
         user = UserFactory.create()
         # NOTE: created_by/modified_by != membership
@@ -178,6 +244,37 @@ class TestProjectMutation(TestCase):
         # No change in project count
         assert project_count == Project.objects.count()
 
+    def test_update_project_with_version_id(self):
+        user = UserFactory.create()
+        project = ProjectFactory.create(created_by=user, modified_by=user)
+        project.add_member(user, role=ProjectMembership.Role.ADMIN)
+        initial_version = project.version
+
+        self.force_login(user)
+        variables = {
+            'project_id': project.id,
+            'data': {
+                'title': 'Project Updated',
+                'versionId': initial_version,
+            }
+        }
+        content = self.query_check(self.Mutation.ProjectUpdate, variables=variables)
+        content_response = content['data']['private']['projectScope']['updateProject']
+        assert content_response['ok'] is True, content_response
+        project.refresh_from_db()
+        assert project.version == initial_version + 1
+        assert project.title == 'Project Updated'
+
+        # Using stale version
+        variables['data']['title'] = 'Project Updated Again'
+        content = self.query_check(self.Mutation.ProjectUpdate, variables=variables)
+        content_response = content['data']['private']['projectScope']['updateProject']
+        assert content_response['ok'] is False, content_response
+        assert content_response['errors'][0]['field'] == 'versionId', content_response
+        project.refresh_from_db()
+        assert project.version == initial_version + 1
+        assert project.title == 'Project Updated'
+
     def test_update_project_membership(self):
         user, *users = UserFactory.create_batch(6)
         # NOTE: created_by/modified_by != membership
@@ -1,6 +1,13 @@
+import json
+
+from django.core.cache import cache
+from django.test import override_settings
+
 from main.tests import TestCase
 
+from apps.common.checks import check_graphql_response_cache
 from apps.project.models import ProjectMembership
+from apps.questionnaire.factories import QuestionnaireFactory
 
 from apps.user.factories import UserFactory
 from apps.project.factories import ProjectFactory
@@ -83,7 +90,8 @@ class TestProjectQuery(TestCase):
 
         # With authentication -----
         self.force_login(user)
-        content = self.query_check(self.Query.ProjectList)
+        # Session + User + Projects + Count (created_by/modified_by are loaded using dataloader)
+        content = self.query_check(self.Query.ProjectList, query_budget=4, thread_hop_budget=24)
         assert content['data']['private']['projects'] == dict(
             count=5,
             items=[
@@ -134,7 +142,8 @@ class TestProjectQuery(TestCase):
         content = _query_check(project_without_role)
         assert content['data']['private']['projectScope'] is None
 
-        content = _query_check(project)
+        # NOTE: Members and users (dataloader) shouldn't scale with the number of members
+        content = _query_check(project, query_budget=6)
         assert content['data']['private']['projectScope'] == dict(
             id=str(project.id),
             project=dict(
@@ -162,3 +171,226 @@ class TestProjectQuery(TestCase):
                 ),
             ),
         )
+
+    def test_projects_search(self):
+        query = '''
+            query MyQuery($search: String) {
+              private {
+                projects(filters: {search: $search}, order: {id: ASC}) {
+                  items {
+                    id
+                  }
+                }
+              }
+            }
+        '''
+        user = UserFactory.create()
+        project_f_params = dict(created_by=user, modified_by=user)
+        project1 = ProjectFactory.create(title='Flood Assessment 2023', **project_f_params)
+        project2 = ProjectFactory.create(title='Drought assessment', **project_f_params)
+        project3 = ProjectFactory.create(title='100% Coverage', **project_f_params)
+        for project in [project1, project2, project3]:
+            project.add_member(user)
+
+        self.force_login(user)
+        for search, expected_projects in [
+            ('assess', [project1, project2]),
+            ('FLOOD', [project1]),
+            ('100%', [project3]),
+            ('%', [project3]),
+            ('_', []),
+        ]:
+            content = self.query_check(query, variables=dict(search=search))
+            assert content['data']['private']['projects']['items'] == [
+                dict(id=str(project.id))
+                for project in expected_projects
+            ], search
+
+    def test_projects_full_text_search(self):
+        query = '''
+            query MyQuery($search: String) {
+              private {
+                projects(filters: {fullTextSearch: $search}) {
+                  count
+                  items {
+                    id
+                  }
+                }
+              }
+            }
+        '''
+        user = UserFactory.create()
+        project_f_params = dict(created_by=user, modified_by=user)
+        project1 = ProjectFactory.create(title='Flood assessment 2023', **project_f_params)
+        project2 = ProjectFactory.create(title='Flood response: flood affected households', **project_f_params)
+        project3 = ProjectFactory.create(title='Drought assessment', **project_f_params)
+        for project in [project1, project2, project3]:
+            project.add_member(user)
+
+        def _query_check(search):
+            content = self.query_check(query, variables=dict(search=search))['data']['private']['projects']
+            assert content['count'] == len(content['items'])
+            return [item['id'] for item in content['items']]
+
+        self.force_login(user)
+        # Ordered by relevance
+        assert _query_check('flood') == [str(project2.id), str(project1.id)]
+        assert _query_check('flood -response') == [str(project1.id)]
+        assert _query_check('"drought assessment"') == [str(project3.id)]
+
+        # Search vector is updated on save
+        project3.title = 'Flood monitoring'
+        project3.save(update_fields=('title',))
+        assert _query_check('drought') == []
+        assert _query_check('monitoring') == [str(project3.id)]
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_TIMEOUT=60)
+    def test_response_cache(self):
+        cache.clear()
+        query = '''
+            query MyQuery($projectId: ID!) {
+              private {
+                projectScope(pk: $projectId) {
+                  questionnaires {
+                    count
+                  }
+                }
+              }
+            }
+        '''
+        user, user2 = UserFactory.create_batch(2)
+        project, project2 = ProjectFactory.create_batch(2, created_by=user, modified_by=user)
+        for _project in [project, project2]:
+            _project.add_member(user)
+            _project.add_member(user2)
+
+        def _query_check(project, **kwargs):
+            content = self.query_check(query, variables=dict(projectId=str(project.id)), **kwargs)
+            return content['data']['private']['projectScope']['questionnaires']['count']
+
+        self.force_login(user)
+        assert _query_check(project) == 0
+        # Cached: Only session + user queries
+        assert _query_check(project, query_budget=2) == 0
+        # Cached per user
+        self.force_login(user2)
+        assert _query_check(project, query_budget=6) == 0
+
+        # Write to other project doesn't invalidate the response
+        with self.captureOnCommitCallbacks(execute=True):
+            QuestionnaireFactory.create(project=project2, created_by=user, modified_by=user)
+        assert _query_check(project, query_budget=2) == 0
+
+        # Write to the project invalidates the response
+        with self.captureOnCommitCallbacks(execute=True):
+            QuestionnaireFactory.create(project=project, created_by=user, modified_by=user)
+        assert _query_check(project, query_budget=6) == 1
+        assert _query_check(project, query_budget=2) == 1
+
+        # Writes by other users don't invalidate the response
+        with self.captureOnCommitCallbacks(execute=True):
+            UserFactory.create()
+        assert _query_check(project, query_budget=2) == 1
+
+        # Per process cache is not allowed (Tests are using LocMemCache)
+        assert [error.id for error in check_graphql_response_cache(None)] == ['common.E003']
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_TIMEOUT=60)
+    def test_response_cache_projects(self):
+        cache.clear()
+        query = '''
+            query MyQuery {
+              private {
+                projects {
+                  items {
+                    title
+                  }
+                }
+              }
+            }
+        '''
+        user, user2 = UserFactory.create_batch(2)
+        project, project2, project3 = ProjectFactory.create_batch(3, created_by=user, modified_by=user)
+        project.add_member(user)
+        project2.add_member(user2)
+
+        def _query_check(**kwargs):
+            content = self.query_check(query, **kwargs)
+            return [item['title'] for item in content['data']['private']['projects']['items']]
+
+        self.force_login(user)
+        assert _query_check() == [project.title]
+        assert _query_check(query_budget=2) == [project.title]
+
+        # Other projects/users
+        with self.captureOnCommitCallbacks(execute=True):
+            project2.title = 'Project 2'
+            project2.save(update_fields=('title',))
+            project2.add_member(UserFactory.create())
+            user2.first_name = 'User 2'
+            user2.save(update_fields=('first_name',))
+        assert _query_check(query_budget=2) == [project.title]
+
+        # User's projects
+        with self.captureOnCommitCallbacks(execute=True):
+            project.title = 'Project 1'
+            project.save(update_fields=('title',))
+        assert _query_check() == ['Project 1']
+        assert _query_check(query_budget=2) == ['Project 1']
+
+        # User's memberships
+        with self.captureOnCommitCallbacks(execute=True):
+            project3.add_member(user)
+        assert sorted(_query_check()) == sorted(['Project 1', project3.title])
+
+    def test_etag(self):
+        query = '''
+            query MyQuery($projectId: ID!) {
+              private {
+                projectScope(pk: $projectId) {
+                  questionnaires {
+                    count
+                  }
+                }
+              }
+            }
+        '''
+        user = UserFactory.create()
+        project = ProjectFactory.create(created_by=user, modified_by=user)
+        project.add_member(user)
+        self.force_login(user)
+
+        def _get(**headers):
+            return self.client.get(
+                '/graphql/',
+                data=dict(query=query, variables=json.dumps(dict(projectId=str(project.id)))),
+                **headers,
+            )
+
+        response = _get()
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response.json()['data']['private']['projectScope']['questionnaires']['count'] == 0
+
+        # Not modified
+        response = _get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response['ETag'] == etag
+
+        # Modified
+        QuestionnaireFactory.create(project=project, created_by=user, modified_by=user)
+        response = _get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert response.json()['data']['private']['projectScope']['questionnaires']['count'] == 1
+
+        # Not for POST
+        response = self.client.post(
+            '/graphql/',
+            data=dict(query=query, variables=dict(projectId=str(project.id))),
+            content_type='application/json',
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == 200
+        assert 'ETag' not in response
@@ -0,0 +1,109 @@
+from django.db import connection
+
+from main.tests import TestCase
+from main.tests.base import capture_query_stats
+
+from apps.project.models import ProjectMembership
+from apps.questionnaire.factories import QuestionnaireFactory
+from apps.user.factories import UserFactory
+from apps.project.factories import ProjectFactory
+
+
+class TestQueryPlans(TestCase):
+    """
+    EXPLAIN plans for the hot resolvers should stay index-driven (No Seq Scan/Sort on the hot tables)
+    """
+    class Query:
+        PROJECT_SCOPE = '''
+            query MyQuery($projectId: ID!) {
+              private {
+                projectScope(pk: $projectId) {
+                  project {
+                    id
+                    currentUserRole
+                    members(order: {joinedAt: ASC}, pagination: {limit: 10, offset: 0}) {
+                      count
+                      items {
+                        id
+                        role
+                      }
+                    }
+                  }
+                  questionnaires(pagination: {limit: 10, offset: 0}) {
+                    count
+                    items {
+                      id
+                    }
+                  }
+                }
+              }
+            }
+        '''
+
+    HOT_TABLES = ('"project_projectmembership"', '"questionnaire_questionnaire"')
+
+    @staticmethod
+    def get_plans(queries: list[str]) -> list[tuple[str, str]]:
+        plans = []
+        with connection.cursor() as cursor:
+            # Without the statistics the planner can pick any of the (equal cost) indexes for the tiny tables
+            cursor.execute('ANALYZE project_projectmembership, questionnaire_questionnaire')
+            # Tables are small in the tests, so force the planner to use the (ordered) indexes if possible
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute('SET enable_bitmapscan = off')
+            try:
+                for sql in queries:
+                    cursor.execute(f'EXPLAIN {sql}')
+                    plans.append((sql, '\n'.join(row[0] for row in cursor.fetchall())))
+            finally:
+                cursor.execute('RESET enable_seqscan')
+                cursor.execute('RESET enable_bitmapscan')
+        return plans
+
+    def test_project_scope(self):
+        user, *other_users = UserFactory.create_batch(5)
+        project = ProjectFactory.create(created_by=user, modified_by=user)
+        project.add_member(user, role=ProjectMembership.Role.ADMIN)
+        for other_user in other_users:
+            project.add_member(other_user)
+        QuestionnaireFactory.create_batch(5, project=project, created_by=user, modified_by=user)
+
+        self.force_login(user)
+        with capture_query_stats(self.id()) as stats:
+            self.query_check(self.Query.PROJECT_SCOPE, variables={'projectId': str(project.pk)})
+
+        plans = self.get_plans(stats.queries)
+
+        def _get_plan(*sql_parts):
+            matched_plans = [
+                plan
+                for sql, plan in plans
+                if all(sql_part in sql for sql_part in sql_parts)
+            ]
+            assert len(matched_plans) == 1, (sql_parts, plans)
+            return matched_plans[0]
+
+        for sql, plan in plans:
+            if any(table in sql for table in self.HOT_TABLES):
+                assert 'Seq Scan' not in plan, (sql, plan)
+                assert 'Sort' not in plan, (sql, plan)
+
+        # Permissions
+        assert 'Index Only Scan using membership_project_member_idx' in _get_plan(
+            'SELECT "project_projectmembership"."role" FROM "project_projectmembership"',
+        )
+        # Current user role
+        assert 'Index Only Scan using membership_project_member_idx' in _get_plan(
+            'FROM "project_project"',
+            '"current_user_role"',
+        )
+        # Members listing
+        assert 'Index Scan using membership_project_joined_idx' in _get_plan(
+            'FROM "project_projectmembership"',
+            'ORDER BY "project_projectmembership"."joined_at" ASC',
+        )
+        # Questionnaires listing
+        assert 'Index Scan using questionnaire_project_id_idx' in _get_plan(
+            'FROM "questionnaire_questionnaire"',
+            'ORDER BY "questionnaire_questionnaire"."id" DESC',
+        )
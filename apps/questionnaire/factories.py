@@ -0,0 +1,11 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from .models import Questionnaire
+
+
+class QuestionnaireFactory(DjangoModelFactory):
+    title = factory.Sequence(lambda n: f'Questionnaire-{n}')
+
+    class Meta:
+        model = Questionnaire
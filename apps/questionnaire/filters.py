@@ -9,10 +9,17 @@ class QuestionnaireFilter:
     id: strawberry.auto
     project: strawberry.auto
     search: str | None
+    full_text_search: str | None
 
     def filter_search(self, queryset):
         if self.search:
             queryset = queryset.filter(
-                title__icontains=self.search,
+                title__ilike_contains=self.search,
             )
         return queryset
+
+    def filter_full_text_search(self, queryset):
+        # NOTE: Ordered by relevance, unless order is provided
+        if self.full_text_search:
+            queryset = Questionnaire.full_text_search(queryset, self.full_text_search)
+        return queryset
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaire', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnaire',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
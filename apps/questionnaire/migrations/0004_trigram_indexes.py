@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:41
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_trigram_indexes'),  # pg_trgm extension
+        ('questionnaire', '0003_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionnaire',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='questionnaire_title_trgm_idx', opclasses=('gin_trgm_ops',)),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def update_search_vectors(apps, _):
+    Questionnaire = apps.get_model('questionnaire', 'Questionnaire')
+    Questionnaire.objects.update(
+        search_vector=django.contrib.postgres.search.SearchVector('title', config='simple'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaire', '0004_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnaire',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='questionnaire',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='questionnaire_search_idx'),
+        ),
+        migrations.RunPython(update_search_vectors, reverse_code=migrations.RunPython.noop),
+    ]
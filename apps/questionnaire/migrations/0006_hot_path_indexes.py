@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0006_hot_path_indexes'),
+        ('questionnaire', '0005_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionnaire',
+            index=models.Index(fields=['project', '-id'], name='questionnaire_project_id_idx'),
+        ),
+        # Single column FK index is covered by the composite index
+        # NOTE: AlterField would also drop and re-create (validate) the FK constraint, so only dropping the index
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='questionnaire',
+                    name='project',
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='project.project',
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX IF EXISTS "questionnaire_questionnaire_project_id_1cc16d8b"',
+                    reverse_sql=(
+                        'CREATE INDEX "questionnaire_questionnaire_project_id_1cc16d8b"'
+                        ' ON "questionnaire_questionnaire" ("project_id")'
+                    ),
+                ),
+            ],
+        ),
+    ]
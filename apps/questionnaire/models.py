@@ -1,16 +1,30 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 
 from utils.common import get_queryset_for_model
-from apps.common.models import UserResource
+from apps.common.models import UserResource, SearchVectorModel
 from apps.project.models import Project
 
 
-class Questionnaire(UserResource):
+class Questionnaire(UserResource, SearchVectorModel):
+    SEARCH_VECTOR_FIELDS = ('title',)
+
     title = models.CharField(max_length=255)
-    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    # NOTE: Indexed using the composite index (See Meta.indexes)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False)
 
     project_id: int
 
+    class Meta(UserResource.Meta):
+        indexes = [
+            # Used by QuestionnaireFilter.search (ilike_contains)
+            GinIndex(fields=('title',), name='questionnaire_title_trgm_idx', opclasses=('gin_trgm_ops',)),
+            # Used by QuestionnaireFilter.full_text_search
+            GinIndex(fields=('search_vector',), name='questionnaire_search_idx'),
+            # Questionnaires listing (project -> ordered by -id, UserResource.Meta.ordering)
+            models.Index(fields=('project', '-id'), name='questionnaire_project_id_idx'),
+        ]
+
     @classmethod
     def get_for(cls, user, queryset=None):
         project_qs = Project.get_for(user)
@@ -1,10 +1,12 @@
+from utils.strawberry.serializers import CachedFieldsSerializerMixin
 from apps.common.serializers import UserResourceSerializer
 from .models import Questionnaire
 
 
-class QuestionnaireSerializer(UserResourceSerializer):
+class QuestionnaireSerializer(CachedFieldsSerializerMixin, UserResourceSerializer):
     class Meta:
         model = Questionnaire
         fields = (
             'title',
+            'version_id',
         )
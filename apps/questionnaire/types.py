@@ -33,3 +33,7 @@ class QuestionnaireType:
     @strawberry.field
     def project_id(self) -> strawberry.ID:
         return strawberry.ID(str(self.project_id))
+
+    @strawberry.field
+    def version_id(self) -> int:
+        return self.version
@@ -2,9 +2,51 @@ import strawberry
 import strawberry_django
 from strawberry.types import Info
 from django.db import models
-from django.db.models.functions import Concat
 
-from .models import User
+from apps.project.models import ProjectMembership
+
+from .models import User, get_full_name_expression
+
+# Trigram index can't be used for the shorter values, prefix match is used instead (Only for autocomplete)
+PREFIX_SEARCH_MAX_LENGTH = 2
+
+
+def exclude_project_members(queryset: models.QuerySet, project_id) -> models.QuerySet:
+    # NOT EXISTS (anti-join) using the membership (member, project) unique index, no DISTINCT needed
+    return queryset.filter(
+        ~models.Exists(
+            ProjectMembership.objects.filter(project_id=project_id, member=models.OuterRef('pk'))
+        )
+    )
+
+
+def filter_users_by_search(queryset: models.QuerySet, value: str, prefix: str = '') -> models.QuerySet:
+    """
+    Search users using email and full name (first_name + last_name) using the indexes defined in User.Meta
+    prefix: Used for the related models. eg: member__
+    """
+    queryset = queryset.annotate(search_full_name=get_full_name_expression(prefix=prefix))
+    # NOTE: Full name contains first_name and last_name
+    return queryset.filter(
+        models.Q(search_full_name__ilike_contains=value) |
+        models.Q(**{f'{prefix}email__ilike_contains': value})
+    )
+
+
+def filter_users_by_autocomplete_search(queryset: models.QuerySet, value: str) -> models.QuerySet:
+    """
+    Same as filter_users_by_search, except shorter values are matched using the prefix (istartswith) indexes
+    NOTE: Short prefix can match most of the users, use with a limit (See apps.user.queries.get_user_autocomplete)
+    """
+    if len(value) > PREFIX_SEARCH_MAX_LENGTH:
+        return filter_users_by_search(queryset, value)
+    return queryset.annotate(
+        search_full_name=get_full_name_expression(),
+    ).filter(
+        models.Q(email__istartswith=value) |
+        models.Q(search_full_name__istartswith=value) |
+        models.Q(last_name__istartswith=value)
+    )
 
 
 @strawberry_django.filters.filter(User, lookups=True)
@@ -17,27 +59,13 @@ class UserFilter:
     def filter_search(self, queryset):
         value = self.search
         if value:
-            queryset = queryset.annotate(
-                full_name=Concat(
-                    models.F("first_name"),
-                    models.Value(" "),
-                    models.F("last_name"),
-                    output_field=models.CharField(),
-                )
-            ).filter(
-                models.Q(full_name__icontains=value) |
-                models.Q(first_name__icontains=value) |
-                models.Q(last_name__icontains=value) |
-                models.Q(email__icontains=value)
-            )
+            queryset = filter_users_by_search(queryset, value)
         return queryset
 
     def filter_members_exclude_project(self, queryset):
         value = self.members_exclude_project
         if value:
-            queryset = queryset.filter(
-                ~models.Q(projectmembership__project_id=value)
-            ).distinct()
+            queryset = exclude_project_members(queryset, value)
         return queryset
 
     def filter_exclude_me(self, queryset, info: Info):
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:47
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.text
+import utils.functions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_first_name_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_last_name_trgm_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(utils.functions.ConcatOp(models.F('first_name'), models.Value(' '), models.F('last_name'), output_field=models.CharField()), name='gin_trgm_ops'), name='user_full_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='text_pattern_ops'), name='user_email_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(utils.functions.ConcatOp(models.F('first_name'), models.Value(' '), models.F('last_name'), output_field=models.CharField())), name='text_pattern_ops'), name='user_full_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('last_name'), name='text_pattern_ops'), name='user_last_name_prefix_idx'),
+        ),
+    ]
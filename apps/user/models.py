@@ -1,6 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+
+from utils.functions import ConcatOp
 
 from .managers import CustomUserManager
 
@@ -23,6 +27,28 @@ class EmailNotificationType(models.IntegerChoices):
             if enum.value not in always_send
         }
 
+    @classmethod
+    def get_digestible(cls):
+        """
+        Notifications whose follow-ups are coalesced into a single email per window (See utils.email.send_email)
+        """
+        return [
+            cls.PASSWORD_CHANGED,
+        ]
+
+
+def get_full_name_expression(prefix: str = ''):
+    """
+    first_name || ' ' || last_name
+    NOTE: Used by the indexes, keep the filters using the same expression
+    """
+    return ConcatOp(
+        models.F(f'{prefix}first_name'),
+        models.Value(' '),
+        models.F(f'{prefix}last_name'),
+        output_field=models.CharField(),
+    )
+
 
 class User(AbstractUser):
     class OptEmailNotificationType(models.IntegerChoices):
@@ -47,6 +73,24 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Used by the search filters (See apps.user.filters.filter_users_by_search)
+            # -- Substring (ilike_contains)
+            GinIndex(fields=('email',), name='user_email_trgm_idx', opclasses=('gin_trgm_ops',)),
+            GinIndex(
+                OpClass(get_full_name_expression(), name='gin_trgm_ops'),
+                name='user_full_name_trgm_idx',
+            ),
+            # -- Prefix (istartswith, See apps.user.filters.filter_users_by_autocomplete_search)
+            models.Index(OpClass(Upper('email'), name='text_pattern_ops'), name='user_email_prefix_idx'),
+            models.Index(
+                OpClass(Upper(get_full_name_expression()), name='text_pattern_ops'),
+                name='user_full_name_prefix_idx',
+            ),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='user_last_name_prefix_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         # Make sure email/username are same and lowercase
         self.email = self.email.lower()
@@ -1,12 +1,69 @@
+import hashlib
+import json
+
 import strawberry
 import strawberry_django
 from strawberry.types import Info
+from django.conf import settings
 
 from asgiref.sync import sync_to_async
+from main.caches import shared_cache, CacheKey
+from main.graphql.response_cache import Generation, get_generations
 from utils.strawberry.paginations import CountList, pagination_field
 
-from .types import UserType, UserMeType, UserOrder
-from .filters import UserFilter
+from apps.project.models import ProjectMembership
+
+from .models import User
+from .types import UserType, UserMeType, UserOrder, UserAutocompleteType
+from .filters import UserFilter, filter_users_by_autocomplete_search, exclude_project_members
+
+
+def get_user_autocomplete(user: User, query: str, exclude_project: strawberry.ID | None, limit: int) -> list[dict]:
+    """
+    Lightweight user search for the member picker (No generic filters, ordering or count)
+    Results are cached per query for a short time, invalidated using the generation counters
+    NOTE: Email is not included, any user can be searched using the short prefixes
+    """
+    query = query.strip()
+    if not query:
+        return []
+    limit = min(max(limit, 1), settings.USER_AUTOCOMPLETE_MAX_LIMIT)
+    # Only project members can see the existing members (excluded users)
+    if exclude_project and not ProjectMembership.objects.filter(project_id=exclude_project, member=user).exists():
+        return []
+
+    cache_key = None
+    if settings.USER_AUTOCOMPLETE_CACHE_TIMEOUT > 0:
+        generation_names = [Generation.USER]
+        if exclude_project:
+            # Bumped when memberships are changed
+            generation_names.append(Generation.project(exclude_project))
+        # NOTE: Search is case-insensitive
+        request_hash = hashlib.sha256(
+            json.dumps([query.upper(), exclude_project, limit, get_generations(generation_names)], sort_keys=True).encode()
+        ).hexdigest()
+        cache_key = CacheKey.USER_AUTOCOMPLETE_KEY_FORMAT.format(request_hash=request_hash)
+        if (items := shared_cache.get(cache_key)) is not None:
+            return items
+
+    # NOTE: filter -> exclude -> limit -> order, short queries can match most of the users (members as well)
+    # Prefix (text_pattern_ops) indexes can't be used for the ordering, so only the limited matches are ordered
+    queryset = filter_users_by_autocomplete_search(User.objects.all(), query)
+    if exclude_project:
+        queryset = exclude_project_members(queryset, exclude_project)
+    items = sorted(
+        (
+            dict(
+                id=str(user_id),
+                display_name=f'{first_name} {last_name}'.strip(),  # Same as User.get_full_name
+            )
+            for user_id, first_name, last_name in queryset.values_list('id', 'first_name', 'last_name')[:limit]
+        ),
+        key=lambda item: (item['display_name'].upper(), int(item['id'])),
+    )
+    if cache_key is not None:
+        shared_cache.set(cache_key, items, settings.USER_AUTOCOMPLETE_CACHE_TIMEOUT)
+    return items
 
 
 @strawberry.type
@@ -28,3 +85,17 @@ class PrivateQuery:
         filters=UserFilter,
         order=UserOrder,
     )
+
+    @strawberry.field
+    @sync_to_async
+    def user_autocomplete(
+        self,
+        info: Info,
+        query: str,
+        exclude_project: strawberry.ID | None = None,
+        limit: int = settings.USER_AUTOCOMPLETE_DEFAULT_LIMIT,
+    ) -> list[UserAutocompleteType]:
+        return [
+            UserAutocompleteType(**item)
+            for item in get_user_autocomplete(info.context.request.user, query, exclude_project, limit)
+        ]
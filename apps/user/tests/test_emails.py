@@ -0,0 +1,252 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.template import loader
+from django.test import override_settings
+from django.utils import timezone
+
+from main.tests import TestCase
+from main.emails import send_password_changed_notification, send_password_reset
+from utils.email import (
+    send_email_outbox_batch,
+    send_bulk_email,
+    get_common_email_context,
+    flush_email_digests,
+    prune_email_outbox,
+)
+from utils.email_template import render_email_template, get_email_template_cache_info
+
+from apps.common.models import EmailOutbox, EmailDigestEvent
+from apps.user.models import EmailNotificationType
+from apps.user.factories import UserFactory
+
+
+@override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_BACKOFF=60, EMAIL_DIGEST_WINDOW=0)
+class TestEmailOutbox(TestCase):
+    def test_email_outbox(self):
+        user = UserFactory.create()
+        invalid_email_user = UserFactory.create(invalid_email=True)
+
+        # Only enqueued
+        send_password_changed_notification(user, '127.0.0.1', None)
+        send_password_changed_notification(invalid_email_user, '127.0.0.1', None)
+        outbox = EmailOutbox.objects.get()
+        assert outbox.user == user
+        assert outbox.email_type == EmailNotificationType.PASSWORD_CHANGED
+        assert outbox.status == EmailOutbox.Status.PENDING
+        assert len(mail.outbox) == 0
+
+        # Send by the worker
+        call_command('send_email_outbox', once=True, stdout=mock.MagicMock())
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.SENT
+        assert outbox.attempts == 1
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [user.email]
+        assert mail.outbox[0].subject == 'QB Password Changed'
+        assert '127.0.0.1' in mail.outbox[0].body
+        # Already sent
+        assert send_email_outbox_batch(10) == (0, 0)
+
+    def test_email_outbox_context_cleanup(self):
+        user = UserFactory.create()
+        _, token = send_password_reset(user)
+        outbox = EmailOutbox.objects.get()
+        assert token in outbox.context['client_reset_password']
+
+        # Context (password reset link) is not kept after sending
+        assert send_email_outbox_batch(10) == (1, 0)
+        assert token in mail.outbox[0].body
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.SENT
+        assert outbox.context == {}
+
+        # Sent emails are deleted after the retention
+        with self.settings(EMAIL_OUTBOX_SENT_RETENTION=60):
+            assert prune_email_outbox() == 0
+            EmailOutbox.objects.update(sent_at=timezone.now() - timezone.timedelta(seconds=61))
+            send_password_reset(user)
+            assert prune_email_outbox(batch_size=1) == 1
+        # Pending email is kept
+        assert EmailOutbox.objects.get().status == EmailOutbox.Status.PENDING
+
+    def test_email_outbox_retry(self):
+        user = UserFactory.create()
+        send_password_changed_notification(user, '127.0.0.1', None)
+        outbox = EmailOutbox.objects.get()
+
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=ConnectionError):
+            assert send_email_outbox_batch(10) == (0, 1)
+            outbox.refresh_from_db()
+            assert outbox.status == EmailOutbox.Status.PENDING
+            assert outbox.attempts == 1
+            assert outbox.next_attempt_at > timezone.now()
+            assert 'ConnectionError' in outbox.last_error
+
+            # Backoff: not picked until next_attempt_at
+            assert send_email_outbox_batch(10) == (0, 0)
+
+            # Max attempts reached
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            assert send_email_outbox_batch(10) == (0, 1)
+            outbox.refresh_from_db()
+            assert outbox.status == EmailOutbox.Status.FAILED
+            assert outbox.attempts == 2
+            assert outbox.context == {}
+        assert len(mail.outbox) == 0
+
+    def test_email_outbox_claim(self):
+        user = UserFactory.create()
+        send_password_changed_notification(user, '127.0.0.1', None)
+        outbox = EmailOutbox.objects.get()
+
+        # Connection failure is recorded as a failed attempt
+        connection = mock.MagicMock()
+        connection.open.side_effect = ConnectionError
+        with mock.patch('utils.email.get_connection', return_value=connection):
+            assert send_email_outbox_batch(10) == (0, 1)
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.PENDING
+        assert outbox.attempts == 1
+        assert outbox.next_attempt_at > timezone.now()
+        assert 'ConnectionError' in outbox.last_error
+
+        # Emails are claimed (SENDING) before sending
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        statuses = []
+        with mock.patch(
+            'django.core.mail.EmailMultiAlternatives.send',
+            side_effect=lambda: statuses.append(EmailOutbox.objects.get().status),
+        ):
+            assert send_email_outbox_batch(10) == (1, 0)
+        assert statuses == [EmailOutbox.Status.SENDING]
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.SENT
+        assert outbox.attempts == 2
+
+        # Claimed emails are picked again only after the sending timeout (eg: worker died)
+        EmailOutbox.objects.update(status=EmailOutbox.Status.SENDING, next_attempt_at=timezone.now())
+        assert send_email_outbox_batch(10) == (1, 0)
+
+
+@override_settings(EMAIL_DIGEST_WINDOW=60)
+class TestEmailDigest(TestCase):
+    def test_email_digest(self):
+        user, user2, user3 = UserFactory.create_batch(3)
+        for _ in range(4):
+            send_password_changed_notification(user, '127.0.0.1', None)
+        for _ in range(2):
+            send_password_changed_notification(user2, '127.0.0.1', None)
+        send_password_changed_notification(user3, '127.0.0.1', None)
+        # First event in the window is sent right away, follow-ups are digested
+        assert EmailOutbox.objects.count() == 3
+        assert EmailDigestEvent.objects.count() == 4
+        call_command('send_email_outbox', once=True, stdout=mock.MagicMock())
+        assert sorted(email.to[0] for email in mail.outbox) == sorted([user.email, user2.email, user3.email])
+        assert all(email.subject == 'QB Password Changed' for email in mail.outbox)
+        mail.outbox.clear()
+
+        # Window not over yet
+        assert flush_email_digests() == 0
+
+        EmailDigestEvent.objects.update(created_at=timezone.now() - timezone.timedelta(seconds=61))
+        assert flush_email_digests() == 2
+        assert EmailDigestEvent.objects.count() == 0
+        call_command('send_email_outbox', once=True, stdout=mock.MagicMock())
+        assert len(mail.outbox) == 2
+        emails = {email.to[0]: email for email in mail.outbox}
+        # Coalesced
+        assert emails[user.email].subject == 'QB: Password Changed (3)'
+        assert emails[user.email].body.count('QB Password Changed') == 3
+        # Single event is sent as it is
+        assert emails[user2.email].subject == 'QB Password Changed'
+
+        # New window: sent right away again
+        EmailOutbox.objects.update(created_at=timezone.now() - timezone.timedelta(seconds=61))
+        send_password_changed_notification(user, '127.0.0.1', None)
+        assert EmailDigestEvent.objects.count() == 0
+        assert EmailOutbox.objects.filter(user=user, status=EmailOutbox.Status.PENDING).count() == 1
+
+
+class TestBulkEmail(TestCase):
+    def test_send_bulk_email(self):
+        users = UserFactory.create_batch(5)
+        UserFactory.create(invalid_email=True)
+        UserFactory.create(email_opt_outs=[EmailNotificationType.NEWS_AND_OFFERS])
+
+        enqueued_count = send_bulk_email(
+            EmailNotificationType.NEWS_AND_OFFERS,
+            'QB News',
+            'emails/user/password_changed/content.html',
+            'emails/user/password_changed/content.txt',
+            context={'time': 'now'},
+            chunk_size=2,
+        )
+        # Only enqueued
+        assert enqueued_count == 5
+        assert EmailOutbox.objects.count() == 5
+        assert len(mail.outbox) == 0
+
+        # Failure for an email doesn't abort the others, it is retried by the outbox
+        og_send = mail.EmailMultiAlternatives.send
+
+        def _send(email_message, *args, **kwargs):
+            if email_message.to == [users[0].email]:
+                raise ConnectionError
+            return og_send(email_message, *args, **kwargs)
+
+        with (
+            mock.patch('utils.email.get_connection', wraps=mail.get_connection) as get_connection_mock,
+            mock.patch('django.core.mail.EmailMultiAlternatives.send', autospec=True, side_effect=_send),
+        ):
+            assert send_email_outbox_batch(10) == (4, 1)
+        # Single connection for the batch
+        get_connection_mock.assert_called_once()
+        assert sorted(email.to[0] for email in mail.outbox) == sorted(user.email for user in users[1:])
+        assert all(email.subject == 'QB News' for email in mail.outbox)
+        assert EmailOutbox.objects.get(user=users[0]).status == EmailOutbox.Status.PENDING
+
+
+class TestEmailTemplate(TestCase):
+    TEMPLATES = (
+        'emails/user/password_reset/content.html',
+        'emails/user/password_reset/content.txt',
+        'emails/user/password_changed/content.html',
+        'emails/user/password_changed/content.txt',
+    )
+
+    def get_context(self, user, client_reset_password, location='127.0.0.1'):
+        return {
+            'welcome': False,
+            'time': timezone.now(),
+            'location': location,
+            'device': None,
+            'client_reset_password': client_reset_password,
+            **get_common_email_context(user, EmailNotificationType.NEWS_AND_OFFERS),
+        }
+
+    def test_render_email_template(self):
+        template_name = 'emails/user/password_reset/content.html'
+        cache_info = get_email_template_cache_info()
+        for user in UserFactory.create_batch(3):
+            context = self.get_context(user, f'https://example.com/reset/{user.pk}')
+            assert render_email_template(template_name, context) == loader.render_to_string(template_name, context)
+        # Skeleton is rendered only once
+        assert get_email_template_cache_info().hits - cache_info.hits >= 2
+
+    def test_render_email_template_special_characters(self):
+        # Escaped by the template (autoescape) and/or re-serialised by premailer (lxml) differently by position
+        users = [
+            UserFactory.create(first_name=first_name)
+            for first_name in ['O\'Brien & <Co>', 'Say "hi"', 'José Ünïcode']
+        ]
+        for user in users:
+            for client_reset_password, location in [
+                (f'https://example.com/reset/{user.pk}?a=1&b="2"<', 'L\'o & <b>'),
+                (f'https://example.com/réset/{user.pk}', 'Zürich'),
+            ]:
+                context = self.get_context(user, client_reset_password, location=location)
+                for template_name in self.TEMPLATES:
+                    assert render_email_template(template_name, context) == \
+                        loader.render_to_string(template_name, context), (template_name, context)
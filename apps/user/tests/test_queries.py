@@ -1,6 +1,8 @@
+from main.caches import shared_cache
 from main.tests import TestCase
 
 from apps.user.models import User
+from apps.project.models import ProjectMembership
 
 from apps.user.factories import UserFactory
 from apps.project.factories import ProjectFactory
@@ -41,6 +43,17 @@ class TestUserQuery(TestCase):
             }
         '''
 
+        USER_AUTOCOMPLETE = '''
+            query MyQuery($query: String!, $excludeProject: ID, $limit: Int) {
+              private {
+                userAutocomplete(query: $query, excludeProject: $excludeProject, limit: $limit) {
+                  id
+                  displayName
+                }
+              }
+            }
+        '''
+
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -94,6 +107,10 @@ class TestUserQuery(TestCase):
             ({'search': '@vil'}, [user2]),
             ({'search': 'sample'}, [user1, user2]),
             ({'search': 'sample@'}, [user1, user2]),
+            ({'search': 'lain'}, [user2]),
+            # -- Short values: substring match as well (Prefix match is only used by autocomplete)
+            ({'search': '@v'}, [user2]),
+            ({'search': 'e@'}, [user1, user2]),
             ({'membersExcludeProject': str(project.pk)}, [self.user, user2, user3]),
             ({}, [self.user, *self.users]),
             ({'excludeMe': True}, self.users),
@@ -113,3 +130,63 @@ class TestUserQuery(TestCase):
                     for user in expected_users
                 ]
             }, (filters, expected_users)
+
+    def test_user_autocomplete(self):
+        user1, user2, user3 = self.users
+        project, other_project = ProjectFactory.create_batch(2, created_by=user1, modified_by=user1)
+        project.add_member(self.user)
+        shared_cache.clear()
+
+        def _query(**variables):
+            content = self.query_check(self.Query.USER_AUTOCOMPLETE, variables=variables)
+            return content['data']['private']['userAutocomplete']
+
+        def _expected(*users):
+            return [
+                {
+                    'id': str(user.id),
+                    'displayName': f'{user.first_name} {user.last_name}',
+                }
+                for user in users
+            ]
+
+        # Without authentication -----
+        content = self.query_check(self.Query.USER_AUTOCOMPLETE, variables={'query': 'hero'}, assert_errors=True)
+        assert content['data'] is None
+
+        # With authentication -----
+        self.force_login(self.user)
+        for variables, expected_users in [
+            ({'query': 'hero'}, [user1, user3]),
+            ({'query': 'HERO'}, [user1, user3]),
+            ({'query': 'vil'}, [user2]),
+            ({'query': 'ex'}, [user2]),
+            ({'query': '  '}, []),
+            ({'query': 'hero', 'excludeProject': str(project.pk)}, [user1, user3]),
+            # Members of other projects are not exposed
+            ({'query': 'hero', 'excludeProject': str(other_project.pk)}, []),
+        ]:
+            assert _query(**variables) == _expected(*expected_users), variables
+        assert _query(query='hero', limit=1)[0] in _expected(user1, user3)
+
+        # Cached: changes without the signals are not visible
+        User.objects.filter(pk=user3.pk).update(first_name='Changed')
+        assert _query(query='hero', excludeProject=str(project.pk)) == _expected(user1, user3)
+        # Cache is invalidated when memberships are changed
+        with self.captureOnCommitCallbacks(execute=True):
+            project.add_member(user1)
+        assert _query(query='hero', excludeProject=str(project.pk)) == [
+            {'id': str(user3.id), 'displayName': f'Changed {user3.last_name}'},
+        ]
+
+        # Exclusion is applied before the limit, even when most of the matches are members
+        members = UserFactory.create_batch(101, first_name='Qx', last_name='Member')
+        ProjectMembership.objects.bulk_create([
+            ProjectMembership(project=project, member=member)
+            for member in members
+        ])
+        user4 = UserFactory.create(first_name='Qx', last_name='Zeta')
+        user5 = UserFactory.create(first_name='Qx', last_name='Omega')
+        shared_cache.clear()
+        assert _query(query='qx', excludeProject=str(project.pk)) == _expected(user5, user4)
+        assert len(_query(query='qx', limit=20)) == 20
@@ -20,6 +20,12 @@ class UserType:
         return self.get_full_name()
 
 
+@strawberry.type
+class UserAutocompleteType:
+    id: strawberry.ID
+    display_name: str
+
+
 @strawberry_django.type(User)
 class UserMeType(UserType):
     email: strawberry.auto
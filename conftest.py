@@ -0,0 +1,10 @@
+def pytest_terminal_summary(terminalreporter):
+    """
+    Show GraphQL calls with most SQL statements/thread hops (Captured by main.tests.TestCase.query_check)
+    """
+    from main.tests.base import get_query_budget_report
+
+    if report := get_query_budget_report():
+        terminalreporter.section('GraphQL query budget report (worst offenders)')
+        for line in report:
+            terminalreporter.write_line(line)
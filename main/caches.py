@@ -1,10 +1,12 @@
 from django.core.cache import caches
 
-local_cache = caches['local-memory']
+# Shared between the processes (Redis if CACHE_REDIS_URL is provided)
+shared_cache = caches['default']
 
 
 class CacheKey:
-    # Redis Cache
-
-    # Local (RAM) Cache
-    TEMP_CLIENT_ID_KEY_FORMAT = 'client-id-mixin-{request_hash}-{instance_type}-{instance_id}'
+    # Shared (Redis) Cache
+    IDEMPOTENCY_KEY_FORMAT = 'idempotency-{user_id}-{key_hash}'
+    GENERATION_KEY_FORMAT = 'generation-{name}'
+    GRAPHQL_RESPONSE_KEY_FORMAT = 'graphql-response-{user_id}-{request_hash}'
+    USER_AUTOCOMPLETE_KEY_FORMAT = 'user-autocomplete-{request_hash}'
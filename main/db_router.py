@@ -0,0 +1,105 @@
+import contextlib
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+
+# Replica selected for the current operation (None -> primary)
+_replica_alias = contextvars.ContextVar('replica_alias', default=None)
+# Models written by the current request (See primary_pin_middleware)
+# NOTE: Mutable set, as the context is copied to the sync_to_async threads
+_request_writes: contextvars.ContextVar[set[str] | None] = contextvars.ContextVar('request_writes', default=None)
+
+
+def is_replica_enabled() -> bool:
+    return bool(settings.DB_REPLICA_ALIASES)
+
+
+@contextlib.contextmanager
+def read_from_replica():
+    """
+    Route the reads to a read replica (Same replica for the whole block)
+    """
+    token = _replica_alias.set(random.choice(settings.DB_REPLICA_ALIASES))
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+# Read-your-writes: Clients are pinned to the primary for a short time after the writes
+# NOTE: Using a cookie (instead of the cache) to avoid extra lookup for each query operation
+def pin_to_primary(response):
+    response.set_cookie(
+        settings.DB_PRIMARY_PIN_COOKIE_NAME,
+        '1',
+        max_age=settings.DB_REPLICA_PIN_SECONDS,
+        domain=settings.SESSION_COOKIE_DOMAIN,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite=settings.SESSION_COOKIE_SAMESITE,
+    )
+
+
+def is_pinned_to_primary(request) -> bool:
+    return settings.DB_PRIMARY_PIN_COOKIE_NAME in request.COOKIES
+
+
+@sync_and_async_middleware
+def primary_pin_middleware(get_response):
+    """
+    Pin the client to the primary after any write by the request (eg: unsubscribe_email view)
+    GraphQL mutations are pinned as well by the view (See main.graphql.schema.CustomAsyncGraphQLView)
+    """
+    def _process_response(request_writes: set[str], response):
+        if request_writes and is_replica_enabled():
+            pin_to_primary(response)
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            request_writes = set()
+            token = _request_writes.set(request_writes)
+            try:
+                response = await get_response(request)
+            finally:
+                _request_writes.reset(token)
+            return _process_response(request_writes, response)
+    else:
+        def middleware(request):
+            request_writes = set()
+            token = _request_writes.set(request_writes)
+            try:
+                response = get_response(request)
+            finally:
+                _request_writes.reset(token)
+            return _process_response(request_writes, response)
+    return middleware
+
+
+class ReplicaRouter:
+    """
+    Reads inside read_from_replica() (GraphQL query operations) goes to the replica, everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica_alias.get()
+        # Transactions should see their own writes
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if (request_writes := _request_writes.get()) is not None:
+            request_writes.add(model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas have the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import typing
+
+from graphql import (
+    GraphQLEnumType,
+    GraphQLInputObjectType,
+    GraphQLInterfaceType,
+    GraphQLObjectType,
+    GraphQLUnionType,
+)
+from strawberry import Schema
+from strawberry.printer import print_schema
+
+ARTIFACT_VERSION = 1
+
+
+def get_sdl_hash(sdl: str) -> str:
+    return hashlib.sha256(sdl.encode()).hexdigest()
+
+
+def get_type_map(schema: Schema) -> dict[str, dict]:
+    """
+    Serialisable map of the user defined types.
+    {type_name: {kind, fields/values/types}}
+    """
+    type_map = {}
+    for name, graphql_type in sorted(schema._schema.type_map.items()):
+        if name.startswith('__'):  # Introspection types
+            continue
+        data: dict[str, typing.Any] = {'kind': type(graphql_type).__name__}
+        if isinstance(graphql_type, (GraphQLObjectType, GraphQLInterfaceType, GraphQLInputObjectType)):
+            data['fields'] = {
+                field_name: str(field.type)
+                for field_name, field in graphql_type.fields.items()
+            }
+        elif isinstance(graphql_type, GraphQLEnumType):
+            data['values'] = list(graphql_type.values.keys())
+        elif isinstance(graphql_type, GraphQLUnionType):
+            data['types'] = [_type.name for _type in graphql_type.types]
+        type_map[name] = data
+    return type_map
+
+
+def generate_schema_artifact(schema: Schema) -> dict:
+    sdl = print_schema(schema)
+    return {
+        'version': ARTIFACT_VERSION,
+        'hash': get_sdl_hash(sdl),
+        'sdl': sdl,
+        'type_map': get_type_map(schema),
+    }
+
+
+def load_schema_artifact(path) -> dict:
+    with open(path) as fp:
+        artifact = json.load(fp)
+    if artifact.get('version') != ARTIFACT_VERSION:
+        raise ValueError(f'Unsupported schema artifact version: {artifact.get("version")}')
+    # Make sure the artifact is not modified manually
+    if artifact['hash'] != get_sdl_hash(artifact['sdl']):
+        raise ValueError('Schema artifact is corrupted: hash mismatch')
+    return artifact
+
+
+def get_stale_types(schema: Schema, artifact: dict) -> list[str]:
+    """
+    Returns list of type names which are not same as in the artifact
+    Empty list means artifact is up to date
+    """
+    if artifact['hash'] == get_sdl_hash(print_schema(schema)):
+        return []
+    current_type_map = get_type_map(schema)
+    artifact_type_map = artifact['type_map']
+    return sorted(
+        name
+        for name in {*current_type_map.keys(), *artifact_type_map.keys()}
+        if current_type_map.get(name) != artifact_type_map.get(name)
+    ) or ['<schema>']  # Same types but different SDL (eg: description/directives)
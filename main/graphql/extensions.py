@@ -0,0 +1,207 @@
+import contextvars
+import dataclasses
+import json
+import logging
+import time
+from collections import defaultdict
+from inspect import isawaitable
+
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from graphql import get_named_type, is_leaf_type
+from strawberry.extensions import SchemaExtension
+from strawberry.extensions.utils import is_introspection_field
+from strawberry.resolvers import is_default_resolver
+
+logger = logging.getLogger(__name__)
+
+# Slowest resolver paths included in the report
+RESOLVERS_REPORT_LIMIT = 20
+
+
+@dataclasses.dataclass
+class OperationStats:
+    sql_count: int = 0
+    sql_duration: float = 0
+    thread_hops: int = 0
+    # path -> [count, duration]
+    resolvers: dict[str, list] = dataclasses.field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+
+
+# Stats for the current operation. NOTE: Context is copied to the sync_to_async threads and dataloader tasks
+current_operation_stats: contextvars.ContextVar[OperationStats | None] = contextvars.ContextVar(
+    'current_operation_stats',
+    default=None,
+)
+
+
+def sql_stats_wrapper(execute, sql, params, many, context):
+    stats = current_operation_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.sql_count += 1
+        stats.sql_duration += time.perf_counter() - start
+
+
+def install_sql_stats_wrapper(connection, **_):
+    """
+    Used with connection_created signal (See apps.common.receivers), connections are per thread.
+    """
+    if sql_stats_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_stats_wrapper)
+
+
+def install_thread_hops_counter():
+    """
+    Count sync_to_async calls (thread hops) for the current operation
+    NOTE: asgiref doesn't provide any hooks for this, so wrapping SyncToAsync.__call__
+    """
+    og_sync_to_async_call = SyncToAsync.__call__
+    if getattr(og_sync_to_async_call, '_counts_thread_hops', False):
+        return
+
+    async def _sync_to_async_call(self, *args, **kwargs):
+        if (stats := current_operation_stats.get()) is not None:
+            stats.thread_hops += 1
+        return await og_sync_to_async_call(self, *args, **kwargs)
+
+    _sync_to_async_call._counts_thread_hops = True
+    SyncToAsync.__call__ = _sync_to_async_call
+
+
+def _should_skip_resolver(resolver, info) -> bool:
+    """
+    Skip introspection and the plain attribute (scalar/enum) fields.
+    NOTE: strawberry's should_skip_tracing also skips strawberry_django's auto fields (eg: projects),
+    which are doing the queryset work, so not using that here
+    """
+    return is_introspection_field(info) or (
+        is_default_resolver(resolver) and is_leaf_type(get_named_type(info.return_type))
+    )
+
+
+def _to_ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+class ParsedDocumentExtension(SchemaExtension):
+    """
+    Use the document already parsed by the view (GraphQLContext.graphql_document) instead of parsing the query again
+    """
+    # NOTE: Extensions are used as the resolver middlewares, skip that (See graphql.get_middleware_resolvers)
+    resolve = None
+
+    def on_parse(self):
+        document = getattr(self.execution_context.context, 'graphql_document', None)
+        if document is not None:
+            self.execution_context.graphql_document = document
+        yield
+
+
+class OperationInstrumentationExtension(SchemaExtension):
+    """
+    Per operation timings (parse/validate/execute), resolver time per field path (scalar attributes are skipped),
+    SQL statements count/duration and thread hops.
+    Written to the log (structured json line) and to the response extensions in DEBUG mode.
+    """
+
+    def __init__(self, *, execution_context):
+        super().__init__(execution_context=execution_context)
+        self.stats = OperationStats()
+        self.timings: dict[str, float] = {}
+        self.report = None
+
+    def _measure(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - start
+
+    def on_operation(self):
+        token = current_operation_stats.set(self.stats)
+        try:
+            yield from self._measure('operation')
+        finally:
+            current_operation_stats.reset(token)
+        self.report = self.get_report()
+        logger.info(json.dumps({'event': 'graphql_operation', **self.report}, separators=(',', ':')))
+
+    def on_parse(self):
+        yield from self._measure('parse')
+
+    def on_validate(self):
+        yield from self._measure('validate')
+
+    def on_execute(self):
+        yield from self._measure('execute')
+
+    def _record_resolver(self, path: str, start: float):
+        resolver_stats = self.stats.resolvers[path]
+        resolver_stats[0] += 1
+        resolver_stats[1] += time.perf_counter() - start
+
+    async def _await_resolver(self, result, path: str, start: float):
+        try:
+            return await result
+        finally:
+            self._record_resolver(path, start)
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        if _should_skip_resolver(_next, info):
+            return _next(root, info, *args, **kwargs)
+        # Without the list indexes (eg: private.projects.items.createdBy)
+        path = '.'.join(key for key in info.path.as_list() if isinstance(key, str))
+        start = time.perf_counter()
+        try:
+            result = _next(root, info, *args, **kwargs)
+        except Exception:
+            self._record_resolver(path, start)
+            raise
+        if isawaitable(result):
+            return self._await_resolver(result, path, start)
+        self._record_resolver(path, start)
+        return result
+
+    def get_report(self) -> dict:
+        operation_type = None
+        if self.execution_context.graphql_document is not None:
+            try:
+                operation_type = self.execution_context.operation_type.value
+            except RuntimeError:  # Invalid operation
+                pass
+        slowest_resolvers = sorted(
+            self.stats.resolvers.items(),
+            key=lambda item: item[1][1],
+            reverse=True,
+        )[:RESOLVERS_REPORT_LIMIT]
+        return {
+            'operation_name': self.execution_context.operation_name,
+            'operation_type': operation_type,
+            'has_errors': bool(self.execution_context.errors),
+            'duration_ms': _to_ms(self.timings.get('operation', 0)),
+            'parse_ms': _to_ms(self.timings.get('parse', 0)),
+            'validate_ms': _to_ms(self.timings.get('validate', 0)),
+            'execute_ms': _to_ms(self.timings.get('execute', 0)),
+            'sql': {
+                'count': self.stats.sql_count,
+                'duration_ms': _to_ms(self.stats.sql_duration),
+            },
+            'thread_hops': self.stats.thread_hops,
+            'resolvers': {
+                path: {
+                    'count': count,
+                    'duration_ms': _to_ms(duration),
+                }
+                for path, (count, duration) in slowest_resolvers
+            },
+        }
+
+    def get_results(self):
+        if not settings.DEBUG:
+            return {}
+        return {
+            'instrumentation': self.report or self.get_report(),
+        }
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import time
+import typing
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import quote_etag
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    get_operation_ast,
+    parse,
+)
+from strawberry.types.graphql import OperationType
+from strawberry.utils.operation import get_operation_type
+
+from main.caches import shared_cache, CacheKey
+
+
+class Generation:
+    """
+    Generation counters, bumped by the model signals (See apps.common.receivers)
+    Cached responses are valid only if the counters they depend on are not changed.
+    Scoped per user/project, so that the writes only invalidate the responses using that data.
+    NOTE: Writes using QuerySet.update()/bulk_create()/bulk_update() don't fire the signals,
+          bump the generations manually for those.
+    NOTE: Counters needs to be shared between the processes (See apps.common.checks.check_graphql_response_cache)
+    NOTE: Other users (eg: projects.items.createdBy of a non-member) can be stale till GRAPHQL_RESPONSE_CACHE_TIMEOUT
+    """
+    # Any user (Used by the user list/search queries)
+    USER = 'user'
+
+    @staticmethod
+    def user(user_id: int) -> str:
+        # User's own data and memberships (eg: me, projects list)
+        return f'user-{user_id}'
+
+    @staticmethod
+    def project(project_id: int) -> str:
+        # Project, members and data inside projectScope (eg: questionnaires)
+        return f'project-{project_id}'
+
+
+# Query fields which can return any user (See Generation.USER)
+GLOBAL_USER_FIELDS = {'user', 'users', 'userAutocomplete'}
+
+
+def get_selected_field_names(document: DocumentNode, operation_name: str | None) -> set[str]:
+    """
+    Fields selected inside the root fields (public/private), including the fragments. eg: {'me', 'projects'}
+    """
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+    def _get_fields(selection_set):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from _get_fields(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                yield from _get_fields(fragments[selection.name.value].selection_set)
+
+    operation = get_operation_ast(document, operation_name)
+    return {
+        field.name.value
+        for root_field in _get_fields(operation.selection_set)
+        if root_field.selection_set is not None
+        for field in _get_fields(root_field.selection_set)
+    }
+
+
+def _get_generation_key(name: str) -> str:
+    return CacheKey.GENERATION_KEY_FORMAT.format(name=name)
+
+
+def get_generations(names: typing.Iterable[str]) -> dict[str, int]:
+    names = list(names)
+    keys = {_get_generation_key(name): name for name in names}
+    generations = {
+        keys[key]: value
+        for key, value in shared_cache.get_many(keys.keys()).items()
+    }
+    for name in names:
+        if name not in generations:
+            # NOTE: Not starting from 0, counters can be evicted and shouldn't match the old values again
+            shared_cache.add(_get_generation_key(name), time.time_ns(), timeout=None)
+            generations[name] = shared_cache.get(_get_generation_key(name))
+    return generations
+
+
+def bump_generations(names: typing.Iterable[str]):
+    for name in names:
+        try:
+            shared_cache.incr(_get_generation_key(name))
+        except ValueError:  # Not in cache
+            shared_cache.add(_get_generation_key(name), time.time_ns(), timeout=None)
+
+
+def is_response_cache_enabled() -> bool:
+    return settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT > 0
+
+
+def parse_query(query: str | None) -> DocumentNode | None:
+    """
+    Parsed once by the view and reused by strawberry (See extensions.ParsedDocumentExtension)
+    """
+    if not query:
+        return None
+    try:
+        return parse(query)
+    except GraphQLError:
+        # Let strawberry handle the invalid queries
+        return None
+
+
+def is_query_operation(document: DocumentNode | None, operation_name: str | None) -> bool:
+    if document is None:
+        return False
+    try:
+        return get_operation_type(document, operation_name) == OperationType.QUERY
+    except RuntimeError:
+        # Unknown operation, let strawberry handle it
+        return False
+
+
+def get_response_cache_key(user_id: int | None, query: str, variables: dict | None, operation_name: str | None) -> str:
+    request_hash = hashlib.sha256(
+        json.dumps([query, variables, operation_name], sort_keys=True).encode()
+    ).hexdigest()
+    return CacheKey.GRAPHQL_RESPONSE_KEY_FORMAT.format(
+        user_id=user_id or 'anonymous',
+        request_hash=request_hash,
+    )
+
+
+def get_response_etag(data: dict) -> str:
+    return quote_etag(
+        hashlib.sha256(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+    )
+
+
+def get_cached_response(cache_key: str) -> tuple[dict, str] | None:
+    """
+    Returns cached response (data, etag) if all the generations it depends on are unchanged
+    """
+    cached = shared_cache.get(cache_key)
+    if cached is None:
+        return None
+    generations, data, etag = cached
+    if get_generations(generations.keys()) != generations:
+        return None
+    return data, etag
+
+
+def set_cached_response(cache_key: str, generations: dict[str, int], data: dict, etag: str):
+    shared_cache.set(cache_key, (generations, data, etag), settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT)
@@ -1,20 +1,51 @@
+import json
 import strawberry
+from http import HTTPStatus
 from asgiref.sync import sync_to_async
-from dataclasses import dataclass
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import parse_etags
+from dataclasses import dataclass, field
+from graphql import DocumentNode
 from strawberry.django.views import AsyncGraphQLView
 from strawberry.django.context import StrawberryDjangoContext
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+from strawberry.types.graphql import OperationType
 
 import utils.strawberry.transformers  # noqa: 403
 
-from apps.project.models import Project
+from apps.project.models import Project, ProjectMembership
 
 from apps.user import queries as user_queries, mutations as user_mutations
 from apps.project import queries as project_queries
 from apps.project import mutations as project_mutations
 # from apps.questionnaire import queries as questionnaire_queries
 
+from main.db_router import (
+    is_replica_enabled,
+    read_from_replica,
+    pin_to_primary,
+    is_pinned_to_primary,
+)
+
 from .permissions import IsAuthenticated
+from .extensions import OperationInstrumentationExtension, ParsedDocumentExtension
 from .dataloaders import GlobalDataLoader
+from .response_cache import (
+    GLOBAL_USER_FIELDS,
+    Generation,
+    get_selected_field_names,
+    is_response_cache_enabled,
+    is_query_operation,
+    parse_query,
+    get_generations,
+    get_response_etag,
+    get_response_cache_key,
+    get_cached_response,
+    set_cached_response,
+)
 
 
 @dataclass
@@ -27,6 +58,12 @@ class ProjectContext:
 class GraphQLContext(StrawberryDjangoContext):
     dl: GlobalDataLoader
     active_project: ProjectContext | None = None
+    # Temporary client ids from TempClientIdMixin (Request scoped)
+    temp_client_ids: dict[tuple[str, int], str] = field(default_factory=dict)
+    # Generations used by the response, None if the response is not cacheable (See response_cache)
+    generations: dict[str, int] | None = None
+    # Parsed by the view, reused by strawberry (See ParsedDocumentExtension)
+    graphql_document: DocumentNode | None = None
 
     @sync_to_async
     def set_active_project(self, project: Project):
@@ -37,11 +74,20 @@ class GraphQLContext(StrawberryDjangoContext):
         if self.request.user.is_anonymous:
             raise Exception('User should be logged in')
         permissions = project.get_permissions_for_user(self.request.user)
+        if self.generations is not None:
+            # NOTE: Fetched before resolving the project data
+            self.generations.update(get_generations([Generation.project(project.id)]))
         self.active_project = ProjectContext(
             project=project,
             permissions=set(permissions)
         )
 
+    def set_temp_client_id(self, instance, client_id: str):
+        self.temp_client_ids[(type(instance).__name__, instance.pk)] = client_id
+
+    def get_temp_client_id(self, instance) -> str | None:
+        return self.temp_client_ids.get((type(instance).__name__, instance.pk))
+
     def has_perm(self, permission: Project.Permission):
         if self.active_project is None:
             raise Exception('There is no active project to select permissions from.')
@@ -56,6 +102,152 @@ class CustomAsyncGraphQLView(AsyncGraphQLView):
             dl=GlobalDataLoader(),
         )
 
+    @staticmethod
+    def set_etag(request, context: GraphQLContext, etag: str):
+        context.response['ETag'] = etag
+        # Clients should always revalidate (Responses are user specific)
+        context.response['Cache-Control'] = 'private, no-cache'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            context.response.status_code = HTTPStatus.NOT_MODIFIED
+
+    @staticmethod
+    def get_response_generation_names(request, document: DocumentNode, operation_name: str | None) -> list[str]:
+        """
+        Generations used by the query response. projectScope generation is added later (See set_active_project)
+        """
+        user = request.user
+        generation_names = []
+        field_names = get_selected_field_names(document, operation_name)
+        if field_names & GLOBAL_USER_FIELDS:
+            generation_names.append(Generation.USER)
+        if user.is_authenticated:
+            generation_names.append(Generation.user(user.pk))
+            if 'projects' in field_names:
+                # NOTE: New memberships are covered by the user generation
+                generation_names.extend(
+                    Generation.project(project_id)
+                    for project_id in ProjectMembership.objects.filter(member=user).values_list('project_id', flat=True)
+                )
+        return generation_names
+
+    async def get_request_data(self, request) -> GraphQLRequestData:
+        # Same as AsyncBaseHTTPView.execute_operation
+        try:
+            return await self.parse_http_body(self.request_adapter_class(request))
+        except json.decoder.JSONDecodeError as e:
+            raise HTTPException(400, 'Unable to parse request body as JSON') from e
+        except KeyError as e:
+            raise HTTPException(400, 'File(s) missing in form data') from e
+
+    async def execute_request(
+        self,
+        request,
+        context: GraphQLContext,
+        root_value,
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        """
+        Same as AsyncBaseHTTPView.execute_operation, using the already parsed request body
+        """
+        allowed_operation_types = OperationType.from_http(request.method)
+        if not self.allow_queries_via_get and request.method == 'GET':
+            allowed_operation_types = allowed_operation_types - {OperationType.QUERY}
+        return await self.schema.execute(
+            request_data.query,
+            root_value=root_value,
+            variable_values=request_data.variables,
+            context_value=context,
+            operation_name=request_data.operation_name,
+            allowed_operation_types=allowed_operation_types,
+        )
+
+    async def execute_operation(self, request, context: GraphQLContext, root_value) -> ExecutionResult:
+        """
+        - Query operations are routed to the read replicas (if configured)
+          Clients are pinned to the primary for a short time after mutations (read-your-writes)
+        - ETag/If-None-Match for GET query operations
+        - Opt-in response cache for query operations (GRAPHQL_RESPONSE_CACHE_TIMEOUT), primary-served only
+        NOTE: Request body and the query are parsed only once here (See ParsedDocumentExtension)
+        """
+        use_replica = is_replica_enabled()
+        use_etag = request.method == 'GET'
+        use_cache = is_response_cache_enabled()
+        if not (use_replica or use_etag or use_cache):
+            return await super().execute_operation(request, context, root_value)
+        request_data = await self.get_request_data(request)
+        context.graphql_document = parse_query(request_data.query)
+        if not is_query_operation(context.graphql_document, request_data.operation_name):
+            result = await self.execute_request(request, context, root_value, request_data)
+            if use_replica:
+                pin_to_primary(context.response)
+            return result
+
+        if use_replica and not is_pinned_to_primary(request):
+            with read_from_replica():
+                # NOTE: Replica can lag behind the generation counters (bumped after the primary commits),
+                # so caching the replica-served responses can store stale data under the new generations
+                return await self.execute_query_operation(
+                    request, context, root_value, request_data, cache_response=False,
+                )
+        return await self.execute_query_operation(request, context, root_value, request_data)
+
+    async def execute_query_operation(
+        self,
+        request,
+        context: GraphQLContext,
+        root_value,
+        request_data: GraphQLRequestData,
+        cache_response: bool = True,
+    ) -> ExecutionResult:
+        use_etag = request.method == 'GET'
+        use_cache = is_response_cache_enabled()
+        if not (use_etag or use_cache):
+            return await self.execute_request(request, context, root_value, request_data)
+
+        cache_key = None
+        if use_cache:
+            @sync_to_async
+            def _get_cached_response():
+                cache_key = get_response_cache_key(
+                    request.user.pk,
+                    request_data.query,
+                    request_data.variables,
+                    request_data.operation_name,
+                )
+                if (cached_response := get_cached_response(cache_key)) is not None:
+                    return cache_key, cached_response, None
+                # NOTE: Fetched before the execution, writes during the execution will invalidate this response
+                return cache_key, None, get_generations(
+                    self.get_response_generation_names(request, context.graphql_document, request_data.operation_name)
+                )
+
+            cache_key, cached_response, context.generations = await _get_cached_response()
+            if cached_response is not None:
+                data, etag = cached_response
+                if use_etag:
+                    self.set_etag(request, context, etag)
+                return ExecutionResult(data=data, errors=None)
+
+        result = await self.execute_request(request, context, root_value, request_data)
+        if result.errors or result.data is None:
+            return result
+        etag = get_response_etag(result.data)
+        if use_cache and cache_response:
+            await sync_to_async(set_cached_response)(cache_key, context.generations, result.data, etag)
+        if use_etag:
+            self.set_etag(request, context, etag)
+        return result
+
+    def create_response(self, response_data, sub_response) -> HttpResponse:
+        if sub_response.status_code == HTTPStatus.NOT_MODIFIED:
+            # Skip the serialization
+            response = HttpResponseNotModified()
+            for name, value in sub_response.items():
+                if name.lower() != 'content-type':
+                    response[name] = value
+            return response
+        return super().create_response(response_data, sub_response)
+
 
 @strawberry.type
 class PublicQuery(
@@ -108,4 +300,8 @@ class Mutation:
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
+    extensions=[
+        ParsedDocumentExtension,
+        *([OperationInstrumentationExtension] if settings.GRAPHQL_INSTRUMENTATION else []),
+    ],
 )
@@ -13,7 +13,6 @@ import sys
 import environ
 
 from pathlib import Path
-from main import sentry
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,6 +26,13 @@ env = environ.Env(
     DJANGO_DB_PASSWORD=str,
     DJANGO_DB_HOST=str,
     DJANGO_DB_PORT=int,
+    DJANGO_DB_CONN_MAX_AGE=(int, 0),  # Seconds. Persistent connections (Not reused across requests with ASGI, use pool)
+    DJANGO_DB_CONN_HEALTH_CHECKS=(bool, True),
+    DJANGO_DB_POOL_MAX_SIZE=(int, 0),  # Connections per process, 0 to disable the pool
+    DJANGO_DB_POOL_TIMEOUT=(float, 10),  # Seconds to wait for a connection when the pool is exhausted
+    DJANGO_DB_POOL_MAX_LIFETIME=(int, 60 * 60),  # Seconds
+    DJANGO_DB_REPLICA_HOSTS=(list, []),  # host[:port] of the read replicas (Uses the default database name/credentials)
+    DJANGO_DB_REPLICA_PIN_SECONDS=(int, 10),  # Clients are pinned to the primary after writes (Should be > replica lag)
     DJANGO_CORS_ORIGIN_REGEX_WHITELIST=(list, []),
     # Static, Media configs
     DJANGO_STATIC_URL=(str, '/static/'),
@@ -75,6 +81,25 @@ env = environ.Env(
     SMTP_EMAIL_PORT=int,
     SMTP_EMAIL_USERNAME=str,
     SMTP_EMAIL_PASSWORD=str,
+    # -- Outbox (./manage.py send_email_outbox)
+    EMAIL_OUTBOX_MAX_ATTEMPTS=(int, 5),
+    EMAIL_OUTBOX_RETRY_BACKOFF=(int, 60),  # Seconds, doubled for each attempt
+    EMAIL_OUTBOX_MAX_RETRY_BACKOFF=(int, 60 * 60),
+    EMAIL_OUTBOX_BATCH_SIZE=(int, 50),
+    EMAIL_OUTBOX_SENDING_TIMEOUT=(int, 10 * 60),  # Seconds, claimed (sending) emails are picked again after this
+    EMAIL_OUTBOX_SENT_RETENTION=(int, 7 * 24 * 60 * 60),  # Seconds, sent emails are deleted after this
+    EMAIL_DIGEST_WINDOW=(int, 15 * 60),  # Seconds, 0 to disable digest
+    # Cache
+    CACHE_REDIS_URL=(str, None),  # eg: redis://redis:6379/0 (Requires redis-py). LocMemCache is used if not provided
+    # Idempotency
+    IDEMPOTENCY_KEY_TTL=(int, 60 * 60 * 24),  # Default 1 day
+    IDEMPOTENCY_STORE=(str, 'utils.strawberry.idempotency.CacheIdempotencyStore'),
+    # GraphQL
+    GRAPHQL_SCHEMA_ARTIFACT=(str, None),  # Generated by ./manage.py graphql_schema --artifact <path>
+    GRAPHQL_RESPONSE_CACHE_TIMEOUT=(int, 0),  # Seconds, 0 to disable the query response cache (Requires CACHE_REDIS_URL)
+    GRAPHQL_INSTRUMENTATION=(bool, False),  # Per operation timings/SQL stats (log, response extensions in DEBUG)
+    GRAPHQL_INSTRUMENTATION_LOG_LEVEL=(str, 'INFO'),
+    USER_AUTOCOMPLETE_CACHE_TIMEOUT=(int, 30),  # Seconds, 0 to disable the cache for userAutocomplete
 )
 
 
@@ -107,6 +132,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # External apps
     'django_premailer',
     'storages',
@@ -127,6 +153,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.db_router.primary_pin_middleware',
 ]
 
 ROOT_URLCONF = 'main.urls'
@@ -159,18 +186,49 @@ WSGI_APPLICATION = 'main.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+DB_POOL_MAX_SIZE = env('DJANGO_DB_POOL_MAX_SIZE')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Pool: See utils/db_backends/postgresql_pool/base.py
+        'ENGINE': 'utils.db_backends.postgresql_pool' if DB_POOL_MAX_SIZE else 'django.db.backends.postgresql',
         'HOST': env('DJANGO_DB_HOST'),
         'PORT': env('DJANGO_DB_PORT'),
         'NAME': env('DJANGO_DB_NAME'),
         'USER': env('DJANGO_DB_USER'),
         'PASSWORD': env('DJANGO_DB_PASSWORD'),
-        'OPTIONS': {'options': '-c search_path=public'},
+        # NOTE: Pooled connections are returned to the pool when django closes them, so not using CONN_MAX_AGE with pool
+        'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else env('DJANGO_DB_CONN_MAX_AGE'),
+        'CONN_HEALTH_CHECKS': env('DJANGO_DB_CONN_HEALTH_CHECKS'),
+        'OPTIONS': {
+            'options': '-c search_path=public',
+            **(
+                {
+                    'pool': {
+                        'max_size': DB_POOL_MAX_SIZE,
+                        'timeout': env('DJANGO_DB_POOL_TIMEOUT'),
+                        'max_lifetime': env('DJANGO_DB_POOL_MAX_LIFETIME'),
+                    },
+                } if DB_POOL_MAX_SIZE else {}
+            ),
+        },
     },
 }
 
+# Read replicas: Used by the GraphQL query operations (See main/db_router.py)
+for _index, _replica_host in enumerate(env('DJANGO_DB_REPLICA_HOSTS')):
+    _host, _, _port = _replica_host.partition(':')
+    DATABASES[f'replica-{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': int(_port) if _port else DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DB_REPLICA_ALIASES = [alias for alias in DATABASES if alias != 'default']
+DB_REPLICA_PIN_SECONDS = env('DJANGO_DB_REPLICA_PIN_SECONDS')
+DATABASE_ROUTERS = ['main.db_router.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -282,6 +340,7 @@ CORS_ALLOW_HEADERS = (
     'x-csrftoken',
     'x-requested-with',
     'sentry-trace',
+    'idempotency-key',
 )
 
 # Sentry Config
@@ -290,6 +349,9 @@ SENTRY_SAMPLE_RATE = env('SENTRY_SAMPLE_RATE')
 SENTRY_ENABLED = False
 
 if SENTRY_DSN:
+    # NOTE: Imported here to avoid loading sentry_sdk if not used
+    from main import sentry
+
     SENTRY_CONFIG = {
         'dsn': SENTRY_DSN,
         'send_default_pii': True,
@@ -306,6 +368,25 @@ if SENTRY_DSN:
     )
     SENTRY_ENABLED = True
 
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # One json line per GraphQL operation
+        'main.graphql.extensions': {
+            'handlers': ['console'],
+            'level': env('GRAPHQL_INSTRUMENTATION_LOG_LEVEL'),
+            'propagate': False,
+        },
+    },
+}
+
 # See if we are inside a test environment (pytest)
 TESTING = (
     any(
@@ -328,6 +409,7 @@ TESTING = (
 # Security Header configuration
 SESSION_COOKIE_NAME = f'questionnaire-builder-{APP_ENVIRONMENT}-sessionid'
 CSRF_COOKIE_NAME = f'questionnaire-builder-{APP_ENVIRONMENT}-csrftoken'
+DB_PRIMARY_PIN_COOKIE_NAME = f'questionnaire-builder-{APP_ENVIRONMENT}-db-primary-pin'
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
@@ -377,20 +459,47 @@ else:
     # DUMP EMAILS TO CONSOLE
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# -- Outbox
+EMAIL_OUTBOX_MAX_ATTEMPTS = env('EMAIL_OUTBOX_MAX_ATTEMPTS')
+EMAIL_OUTBOX_RETRY_BACKOFF = env('EMAIL_OUTBOX_RETRY_BACKOFF')
+EMAIL_OUTBOX_MAX_RETRY_BACKOFF = env('EMAIL_OUTBOX_MAX_RETRY_BACKOFF')
+EMAIL_OUTBOX_BATCH_SIZE = env('EMAIL_OUTBOX_BATCH_SIZE')
+EMAIL_OUTBOX_SENDING_TIMEOUT = env('EMAIL_OUTBOX_SENDING_TIMEOUT')
+EMAIL_OUTBOX_SENT_RETENTION = env('EMAIL_OUTBOX_SENT_RETENTION')
+# -- Digest (EmailNotificationType.get_digestible)
+EMAIL_DIGEST_WINDOW = env('EMAIL_DIGEST_WINDOW')
+
 # Strawberry
+# -- Schema artifact (Validated by ./manage.py check --deploy)
+GRAPHQL_SCHEMA_ARTIFACT = env('GRAPHQL_SCHEMA_ARTIFACT')
+# -- Response cache (Invalidated using generation counters, see main/graphql/response_cache.py)
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = env('GRAPHQL_RESPONSE_CACHE_TIMEOUT')
+# -- Instrumentation (See main/graphql/extensions.py)
+# NOTE: Opt-in, adds overhead to each resolver/SQL statement and patches SyncToAsync (thread hops)
+GRAPHQL_INSTRUMENTATION = env('GRAPHQL_INSTRUMENTATION')
 # -- Pagination
 DEFAULT_PAGINATION_LIMIT = 50
 MAX_PAGINATION_LIMIT = 100
+# -- User autocomplete (Also invalidated using generation counters)
+USER_AUTOCOMPLETE_CACHE_TIMEOUT = env('USER_AUTOCOMPLETE_CACHE_TIMEOUT')
+USER_AUTOCOMPLETE_DEFAULT_LIMIT = 10
+USER_AUTOCOMPLETE_MAX_LIMIT = 20
+# -- Idempotency (ModelMutation)
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_TTL = env('IDEMPOTENCY_KEY_TTL')
+IDEMPOTENCY_STORE = env('IDEMPOTENCY_STORE')
 
 # Caches
+CACHE_REDIS_URL = env('CACHE_REDIS_URL')
 CACHES = {
+    # Shared between the processes (main.caches.shared_cache)
     'default': {
-        # XXX: Use redis if needed
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+        'KEY_PREFIX': 'qb',
+    } if CACHE_REDIS_URL and not TESTING else {
+        # Local stand-in (for tests/development), not shared between the processes
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'local-memory-01',
     },
-    'local-memory': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'local-memory-02',
-    }
 }
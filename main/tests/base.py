@@ -1,8 +1,69 @@
+import contextlib
+import dataclasses
 from typing import Dict
 from enum import Enum
+from unittest import mock
 
+from asgiref.sync import SyncToAsync
 from django.test import TestCase as BaseTestCase
-from django.db import models
+from django.test.utils import CaptureQueriesContext
+from django.db import models, connection
+
+
+@dataclasses.dataclass
+class QueryStats:
+    name: str
+    queries: list[str] = dataclasses.field(default_factory=list)
+    thread_hops: int = 0
+    query_budget: int | None = None
+    thread_hop_budget: int | None = None
+
+
+# Collected by TestCase.query_check, used for the budget report (See conftest.py)
+QUERY_STATS_REGISTRY: list[QueryStats] = []
+
+
+@contextlib.contextmanager
+def capture_query_stats(name: str):
+    """
+    Capture SQL statements and thread hops (sync_to_async calls)
+    """
+    stats = QueryStats(name=name)
+    og_sync_to_async_call = SyncToAsync.__call__
+
+    async def _sync_to_async_call(self, *args, **kwargs):
+        stats.thread_hops += 1
+        return await og_sync_to_async_call(self, *args, **kwargs)
+
+    with (
+        mock.patch.object(SyncToAsync, '__call__', _sync_to_async_call),
+        CaptureQueriesContext(connection) as queries_context,
+    ):
+        yield stats
+    stats.queries = [query['sql'] for query in queries_context.captured_queries]
+
+
+def get_query_budget_report(limit: int = 10) -> list[str]:
+    """
+    Worst offenders by number of SQL statements per GraphQL call
+    """
+    worst_stats = sorted(
+        QUERY_STATS_REGISTRY,
+        key=lambda stats: (-len(stats.queries), -stats.thread_hops),
+    )[:limit]
+    return [
+        (
+            '{queries:>4} queries (budget: {query_budget})'
+            ' {thread_hops:>4} thread hops (budget: {thread_hop_budget}) {name}'
+        ).format(
+            queries=len(stats.queries),
+            query_budget=stats.query_budget if stats.query_budget is not None else '-',
+            thread_hops=stats.thread_hops,
+            thread_hop_budget=stats.thread_hop_budget if stats.thread_hop_budget is not None else '-',
+            name=stats.name,
+        )
+        for stats in worst_stats
+    ]
 
 
 class TestCase(BaseTestCase):
@@ -17,23 +78,55 @@ class TestCase(BaseTestCase):
         query: str,
         assert_errors: bool = False,
         variables: dict | None = None,
+        query_budget: int | None = None,
+        thread_hop_budget: int | None = None,
         **kwargs,
     ) -> Dict:
-        response = self.client.post(
-            "/graphql/",
-            data={
-                "query": query,
-                "variables": variables,
-            },
-            content_type="application/json",
-            **kwargs,
-        )
+        """
+        query_budget: Maximum number of SQL statements allowed for the call
+        thread_hop_budget: Maximum number of sync_to_async calls allowed for the call
+        """
+        with capture_query_stats(self.id()) as stats:
+            response = self.client.post(
+                "/graphql/",
+                data={
+                    "query": query,
+                    "variables": variables,
+                },
+                content_type="application/json",
+                **kwargs,
+            )
+        stats.query_budget = query_budget
+        stats.thread_hop_budget = thread_hop_budget
+        QUERY_STATS_REGISTRY.append(stats)
         if assert_errors:
             self.assertResponseHasErrors(response)
         else:
             self.assertResponseNoErrors(response)
+        self.assertWithinBudget(stats)
         return response.json()
 
+    def assertWithinBudget(self, stats: QueryStats):
+        if stats.query_budget is not None:
+            self.assertLessEqual(
+                len(stats.queries),
+                stats.query_budget,
+                '{} queries executed, budget is {}\nCaptured queries were:\n{}'.format(
+                    len(stats.queries),
+                    stats.query_budget,
+                    '\n'.join(
+                        f'{i}. {query}'
+                        for i, query in enumerate(stats.queries, start=1)
+                    ),
+                ),
+            )
+        if stats.thread_hop_budget is not None:
+            self.assertLessEqual(
+                stats.thread_hops,
+                stats.thread_hop_budget,
+                f'{stats.thread_hops} thread hops (sync_to_async), budget is {stats.thread_hop_budget}',
+            )
+
     def assertResponseNoErrors(self, resp, msg=None):
         """
         Assert that the call went through correctly. 200 means the syntax is ok,
@@ -0,0 +1,117 @@
+import gc
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.db.backends.postgresql.base import Database
+
+from utils.db_backends.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.transaction_status = Database.extensions.TRANSACTION_STATUS_IDLE
+        self.usable = True
+        self.rollback = mock.Mock()
+
+    def get_transaction_status(self):
+        return self.transaction_status
+
+    def cursor(self):
+        if not self.usable:
+            raise Database.OperationalError('Connection lost')
+        return mock.MagicMock()
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(SimpleTestCase):
+    def get_pool(self, **kwargs):
+        return ConnectionPool(**{'name': 'test', 'max_size': 2, 'timeout': 0.01, 'max_lifetime': None, **kwargs})
+
+    def test_reuse(self):
+        pool = self.get_pool()
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        assert pool.get(FakeConnection) is connection
+        assert pool.get_stats() | {'wait_ms_mean': 0, 'wait_ms_max': 0} == {
+            'name': 'test',
+            'max_size': 2,
+            'size': 1,
+            'idle': 0,
+            'in_use': 1,
+            'opened': 1,
+            'closed': 0,
+            'checkouts': 2,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'reclaimed': 0,
+            'wait_ms_mean': 0,
+            'wait_ms_max': 0,
+        }
+
+    def test_max_size(self):
+        pool = self.get_pool()
+        connections = [pool.get(FakeConnection), pool.get(FakeConnection)]
+        with self.assertRaises(PoolTimeout):
+            pool.get(FakeConnection)
+        assert pool.get_stats()['timeouts'] == 1
+        pool.put(connections[0])
+        assert pool.get(FakeConnection) is connections[0]
+
+    def test_put(self):
+        pool = self.get_pool()
+        # Pending transaction is rolled back
+        connection = pool.get(FakeConnection)
+        connection.transaction_status = Database.extensions.TRANSACTION_STATUS_INTRANS
+        pool.put(connection)
+        connection.rollback.assert_called_once()
+        assert pool.get(FakeConnection) is connection
+        # Broken connection is closed
+        connection.transaction_status = Database.extensions.TRANSACTION_STATUS_UNKNOWN
+        pool.put(connection)
+        assert connection.closed
+        new_connection = pool.get(FakeConnection)
+        assert new_connection is not connection
+        assert pool.get_stats()['closed'] == 1
+
+    def test_health_check_and_max_lifetime(self):
+        pool = self.get_pool()
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        connection.usable = False
+        # Not checked
+        assert pool.get(FakeConnection) is connection
+        pool.put(connection)
+        # Checked
+        assert pool.get(FakeConnection, health_check=True) is not connection
+        assert connection.closed
+        assert pool.get_stats()['health_check_failures'] == 1
+
+        pool = self.get_pool(max_lifetime=60)
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        with mock.patch('time.monotonic', return_value=10 ** 9):
+            assert pool.get(FakeConnection) is not connection
+        assert connection.closed
+
+    def test_reclaim_lost_connections(self):
+        pool = self.get_pool()
+        connection = pool.get(FakeConnection)
+        pool.get(FakeConnection)  # Lost without returning to the pool
+        gc.collect()
+        assert pool.get_stats()['in_use'] == 1
+        assert pool.get_stats()['reclaimed'] == 1
+        # Slot is available again
+        new_connection = pool.get(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.get(FakeConnection)
+        # Returned connections are not reclaimed
+        pool.put(connection)
+        del connection
+        gc.collect()
+        assert pool.get_stats()['reclaimed'] == 1
+        assert pool.get_stats()['idle'] == 1
+        assert pool.get_stats()['in_use'] == 1
+        pool.put(new_connection)
@@ -0,0 +1,139 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from graphql import parse
+
+from main.db_router import ReplicaRouter, primary_pin_middleware, read_from_replica
+from main.tests import TestCase
+from apps.user.models import User
+from apps.user.factories import UserFactory
+
+
+@override_settings(DB_REPLICA_ALIASES=['replica-0', 'replica-1'])
+class TestReplicaRouter(SimpleTestCase):
+    def test_router(self):
+        router = ReplicaRouter()
+        default_connection = mock.Mock(in_atomic_block=False)
+        with mock.patch('main.db_router.connections', {DEFAULT_DB_ALIAS: default_connection}):
+            assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+            with read_from_replica():
+                alias = router.db_for_read(User)
+                assert alias in ['replica-0', 'replica-1']
+                # Same replica for the whole block
+                assert {router.db_for_read(User) for _ in range(10)} == {alias}
+                assert router.db_for_write(User) == DEFAULT_DB_ALIAS
+                # Transactions
+                default_connection.in_atomic_block = True
+                assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+            default_connection.in_atomic_block = False
+            assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+        assert router.allow_migrate(DEFAULT_DB_ALIAS, 'user') is True
+        assert router.allow_migrate('replica-0', 'user') is False
+
+
+@override_settings(DB_REPLICA_ALIASES=['replica-0'])
+class TestReplicaRouting(TestCase):
+    class Query:
+        ME = '''
+            query MyQuery {
+              public {
+                me {
+                  id
+                }
+              }
+            }
+        '''
+
+    class Mutation:
+        PROJECT_CREATE = '''
+            mutation MyMutation($data: ProjectCreateInput!) {
+              private {
+                createProject(data: $data) {
+                  ok
+                }
+              }
+            }
+        '''
+
+    def test_read_your_writes(self):
+        user = UserFactory.create()
+        self.force_login(user)
+        with mock.patch('main.graphql.schema.read_from_replica', wraps=read_from_replica) as read_from_replica_mock:
+            # Query operations are routed to the replica
+            self.query_check(self.Query.ME)
+            read_from_replica_mock.assert_called_once()
+            read_from_replica_mock.reset_mock()
+
+            # Mutations: Primary (+ pin the client to the primary)
+            assert settings.DB_PRIMARY_PIN_COOKIE_NAME not in self.client.cookies
+            content = self.query_check(self.Mutation.PROJECT_CREATE, variables={'data': {'title': 'Project 1'}})
+            assert content['data']['private']['createProject']['ok'] is True
+            read_from_replica_mock.assert_not_called()
+            assert self.client.cookies[settings.DB_PRIMARY_PIN_COOKIE_NAME]['max-age'] == settings.DB_REPLICA_PIN_SECONDS
+
+            # Query operations after the writes: Primary
+            self.query_check(self.Query.ME)
+            read_from_replica_mock.assert_not_called()
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_TIMEOUT=60)
+    def test_response_cache(self):
+        cache.clear()
+        user = UserFactory.create()
+        self.force_login(user)
+        with mock.patch('main.graphql.schema.set_cached_response') as set_cached_response_mock:
+            # Replica-served responses are not cached
+            self.query_check(self.Query.ME)
+            set_cached_response_mock.assert_not_called()
+
+            # Primary-served responses are cached
+            self.query_check(self.Mutation.PROJECT_CREATE, variables={'data': {'title': 'Project 1'}})
+            self.query_check(self.Query.ME)
+            set_cached_response_mock.assert_called_once()
+
+    @override_settings(DB_REPLICA_ALIASES=[], GRAPHQL_RESPONSE_CACHE_TIMEOUT=60)
+    def test_query_parsed_once(self):
+        cache.clear()
+        user = UserFactory.create()
+        self.force_login(user)
+        with (
+            mock.patch('main.graphql.response_cache.parse', wraps=parse) as parse_mock,
+            mock.patch('strawberry.schema.execute.parse_document') as strawberry_parse_mock,
+        ):
+            # Cache miss: parsed by the view, reused by strawberry
+            content = self.query_check(self.Query.ME)
+            assert content['data']['public']['me']['id'] == str(user.pk)
+            parse_mock.assert_called_once()
+            strawberry_parse_mock.assert_not_called()
+
+    def test_primary_pin_middleware(self):
+        user = UserFactory.create()
+        request_factory = RequestFactory()
+
+        def _write():
+            User.objects.filter(pk=user.pk).update(first_name='Changed')
+
+        def _view(request):
+            if request.GET.get('write'):
+                _write()
+            return HttpResponse()
+
+        async def _async_view(request):
+            if request.GET.get('write'):
+                await sync_to_async(_write)()
+            return HttpResponse()
+
+        for middleware in [
+            primary_pin_middleware(_view),
+            async_to_sync(primary_pin_middleware(_async_view)),
+        ]:
+            # No writes (eg: unsubscribe_email with invalid token)
+            response = middleware(request_factory.get('/'))
+            assert settings.DB_PRIMARY_PIN_COOKIE_NAME not in response.cookies
+            # Writes outside GraphQL mutations (eg: unsubscribe_email)
+            response = middleware(request_factory.get('/', {'write': 1}))
+            assert response.cookies[settings.DB_PRIMARY_PIN_COOKIE_NAME]['max-age'] == settings.DB_REPLICA_PIN_SECONDS
@@ -0,0 +1,85 @@
+import json
+from unittest import mock
+
+from asgiref.sync import SyncToAsync
+from django.db import connection
+from django.test import override_settings
+
+from main.graphql.extensions import (
+    OperationInstrumentationExtension,
+    install_sql_stats_wrapper,
+    install_thread_hops_counter,
+)
+from main.graphql.schema import schema
+from main.tests import TestCase
+from main.tests.base import QUERY_STATS_REGISTRY
+from apps.project.models import ProjectMembership
+from apps.user.factories import UserFactory
+from apps.project.factories import ProjectFactory
+
+
+class TestOperationInstrumentation(TestCase):
+    class Query:
+        PROJECTS = '''
+            query Projects {
+              private {
+                projects {
+                  count
+                  items {
+                    id
+                    title
+                    createdBy {
+                      displayName
+                    }
+                  }
+                }
+              }
+            }
+        '''
+
+    def setUp(self):
+        super().setUp()
+        # NOTE: GRAPHQL_INSTRUMENTATION is disabled by default, enable it for these tests only
+        for patcher in [
+            mock.patch.object(schema, 'extensions', [*schema.extensions, OperationInstrumentationExtension]),
+            # Restored after the test
+            mock.patch.object(SyncToAsync, '__call__', SyncToAsync.__call__),
+            mock.patch.object(connection, 'execute_wrappers', list(connection.execute_wrappers)),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        install_sql_stats_wrapper(connection)
+        install_thread_hops_counter()
+
+    def test_instrumentation(self):
+        user = UserFactory.create()
+        for _ in range(3):
+            project = ProjectFactory.create(created_by=user, modified_by=user)
+            project.add_member(user, role=ProjectMembership.Role.ADMIN)
+        self.force_login(user)
+
+        # Log -----
+        with self.assertLogs('main.graphql.extensions', level='INFO') as logs:
+            content = self.query_check(self.Query.PROJECTS)
+        assert 'extensions' not in content
+        assert len(logs.records) == 1
+        report = json.loads(logs.records[0].getMessage())
+        assert report['event'] == 'graphql_operation'
+        assert report['operation_name'] == 'Projects'
+        assert report['operation_type'] == 'query'
+        assert report['has_errors'] is False
+        assert report['duration_ms'] >= report['execute_ms'] > 0
+        # NOTE: request.user (session/user queries) is lazily loaded within the operation (IsAuthenticated)
+        assert report['sql']['count'] == len(QUERY_STATS_REGISTRY[-1].queries)
+        assert 0 < report['thread_hops'] <= QUERY_STATS_REGISTRY[-1].thread_hops
+        assert report['resolvers']['private.projects']['count'] == 1
+        assert report['resolvers']['private.projects.items.createdBy']['count'] == 3
+        assert report['resolvers']['private.projects.items.createdBy.displayName']['count'] == 3
+        # Plain attributes (default resolvers for scalar fields) are not measured
+        assert 'private.projects.items.title' not in report['resolvers']
+
+        # Response extensions (DEBUG) -----
+        with override_settings(DEBUG=True):
+            content = self.query_check(self.Query.PROJECTS)
+        assert content['extensions']['instrumentation']['operation_name'] == 'Projects'
+        assert content['extensions']['instrumentation']['sql']['count'] == report['sql']['count']
@@ -21,6 +21,7 @@ from django.conf import settings
 
 from main.graphql.schema import CustomAsyncGraphQLView, schema as graphql_schema
 from apps.user.views import unsubscribe_email
+from apps.common.views import db_pool_stats
 
 
 urlpatterns = [
@@ -39,6 +40,9 @@ urlpatterns = [
         unsubscribe_email,
         name='unsubscribe_email'
     ),
+
+    # Metrics (Staff only)
+    path('metrics/db-pool/', db_pool_stats, name='db_pool_stats'),
 ]
 
 
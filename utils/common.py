@@ -1,7 +1,6 @@
 import re
 import copy
 import typing
-from user_agents import parse
 from django.db import models
 
 
@@ -33,6 +32,8 @@ def get_client_ip(request):
 def get_device_type(request):
     http_agent = request.META.get('HTTP_USER_AGENT')
     if http_agent:
+        # NOTE: Lazy import, user_agents loads all the regexes on import (slow startup)
+        from user_agents import parse
         user_agent = parse(http_agent)
         return user_agent.browser.family + ',' + user_agent.os.family
     return
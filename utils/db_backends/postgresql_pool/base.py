@@ -0,0 +1,61 @@
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .creation import DatabaseCreation
+from .pool import get_pool
+
+DEFAULT_POOL_OPTIONS = {
+    'max_size': 10,
+    'timeout': 10,  # Seconds to wait for a connection when the pool is exhausted
+    'max_lifetime': 60 * 60,  # Seconds, None to keep the connections forever
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend (psycopg2) using a process level connection pool. Configured using OPTIONS['pool']
+    (Similar to the native pool in django 5.1+, which requires psycopg 3)
+    Use with CONN_MAX_AGE=0, connections are returned to the pool when django closes them (end of the request).
+    CONN_HEALTH_CHECKS: Check the pooled connections (SELECT 1) before reusing them.
+    """
+    creation_class = DatabaseCreation
+
+    @property
+    def pool_options(self) -> dict:
+        options = self.settings_dict['OPTIONS'].get('pool', {})
+        return {**DEFAULT_POOL_OPTIONS, **(options if isinstance(options, dict) else {})}
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)  # Not a connection parameter
+        return conn_params
+
+    def get_pool(self, conn_params):
+        pool_options = self.pool_options
+        return get_pool(
+            # NOTE: Same alias is used with different databases (eg: test database, postgres database)
+            tuple(sorted(conn_params.items(), key=lambda item: item[0])),
+            name=conn_params.get('dbname', self.alias),
+            max_size=pool_options['max_size'],
+            timeout=pool_options['timeout'],
+            max_lifetime=pool_options['max_lifetime'],
+        )
+
+    @base.async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        connection = pool.get(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            health_check=self.settings_dict['CONN_HEALTH_CHECKS'],
+        )
+        # Set by get_new_connection for the new connections
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        self._pool = pool
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.put(self.connection)
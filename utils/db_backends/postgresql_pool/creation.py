@@ -0,0 +1,10 @@
+from django.db.backends.postgresql import creation
+
+from .pool import close_idle_connections
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections to the test database would block DROP DATABASE
+        close_idle_connections(test_database_name)
+        return super()._destroy_test_db(test_database_name, verbosity)
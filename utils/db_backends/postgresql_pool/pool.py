@@ -0,0 +1,208 @@
+import collections
+import threading
+import time
+import weakref
+
+from django.db.backends.postgresql.base import Database
+
+
+class PoolTimeout(Database.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of the raw (psycopg2) connections, shared by all the threads of the process.
+    NOTE: Django connections are thread-local and ASGI runs the sync code (sync_to_async) of each request in a new
+    thread, so persistent connections (CONN_MAX_AGE) are not reused across the requests, this pool is used instead.
+    NOTE: Connections which are never returned (eg: thread exits without closing the django connection) are reclaimed
+    when they are garbage collected, otherwise their slots are lost and the pool is eventually exhausted.
+    """
+
+    def __init__(self, name: str, max_size: int, timeout: float, max_lifetime: float | None):
+        self.name = name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        # Limits total connections (idle + in use)
+        self._semaphore = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = collections.deque()  # (connection, created_at)
+        self._checked_out = {}  # id(connection) -> (created_at, finalizer) (For the connections in use)
+        # Metrics
+        self.in_use = 0
+        self.opened = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.health_check_failures = 0
+        self.reclaimed = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.max_lifetime is not None and time.monotonic() - created_at > self.max_lifetime
+
+    @staticmethod
+    def _is_usable(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def _close(self, connection):
+        with self._lock:
+            self.closed += 1
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+
+    def get(self, connect, health_check: bool = False):
+        """
+        Returns an idle connection (most recently used) or a new connection using `connect`.
+        Waits for `timeout` seconds if the pool is exhausted.
+        """
+        start = time.monotonic()
+        if not self._semaphore.acquire(timeout=self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(
+                f'Couldn\'t get a connection from the pool "{self.name}" within {self.timeout} seconds'
+                f' (max_size: {self.max_size})'
+            )
+        wait_time = time.monotonic() - start
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    connection = connect()
+                    created_at = time.monotonic()
+                    with self._lock:
+                        self.opened += 1
+                    break
+                connection, created_at = item
+                if connection.closed or self._is_expired(created_at):
+                    self._close(connection)
+                    continue
+                if health_check and not self._is_usable(connection):
+                    with self._lock:
+                        self.health_check_failures += 1
+                    self._close(connection)
+                    continue
+                break
+        except BaseException:
+            self._semaphore.release()
+            raise
+        key = id(connection)
+        # NOTE: The callback shouldn't reference the connection
+        finalizer = weakref.finalize(connection, self._reclaim, key)
+        finalizer.atexit = False
+        with self._lock:
+            self._checked_out[key] = (created_at, finalizer)
+            self.in_use += 1
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+        return connection
+
+    def put(self, connection):
+        """
+        Return the connection to the pool. Pending transaction is rolled back, broken/expired connections are closed.
+        """
+        with self._lock:
+            created_at, finalizer = self._checked_out.pop(id(connection), (None, None))
+        if finalizer is None:
+            # Not checked out from this pool (or already reclaimed)
+            self._close(connection)
+            return
+        finalizer.detach()
+        try:
+            reusable = (
+                created_at is not None and
+                not connection.closed and
+                not self._is_expired(created_at)
+            )
+            if reusable:
+                status = connection.get_transaction_status()
+                if status == Database.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    reusable = False
+                elif status != Database.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+        except Database.Error:
+            reusable = False
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append((connection, created_at))
+            else:
+                self._close(connection)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._semaphore.release()
+
+    def _reclaim(self, key: int):
+        """
+        Called when a checked out connection is garbage collected without being returned to the pool.
+        psycopg2 closes the connection on deallocation, only the slot is released here.
+        """
+        with self._lock:
+            if self._checked_out.pop(key, None) is None:
+                return
+            self.in_use -= 1
+            self.closed += 1
+            self.reclaimed += 1
+        self._semaphore.release()
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = self._idle, collections.deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'max_size': self.max_size,
+                'size': len(self._idle) + self.in_use,
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'opened': self.opened,
+                'closed': self.closed,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'health_check_failures': self.health_check_failures,
+                'reclaimed': self.reclaimed,
+                'wait_ms_mean': round(self.wait_time_total * 1000 / self.checkouts, 3) if self.checkouts else 0,
+                'wait_ms_max': round(self.wait_time_max * 1000, 3),
+            }
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key: tuple, name: str, max_size: int, timeout: float, max_lifetime: float | None) -> ConnectionPool:
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(name, max_size, timeout, max_lifetime)
+        return _pools[key]
+
+
+def get_pools_stats() -> list[dict]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.get_stats() for pool in pools]
+
+
+def close_idle_connections(name: str | None = None):
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        if name is None or pool.name == name:
+            pool.close_idle()
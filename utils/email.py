@@ -1,30 +1,35 @@
+import datetime
+import itertools
 import logging
+import typing
 
 from django.utils.encoding import force_bytes
 from django.conf import settings
+from django.utils import timezone, formats
 from django.utils.http import urlsafe_base64_encode
-from django.template import loader
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import models, transaction
 
 from main.token import TokenManager
+from utils.email_template import render_email_template
 from apps.user.models import User, EmailNotificationType
+from apps.common.models import EmailOutbox, EmailDigestEvent
 
 
 logger = logging.getLogger(__name__)
 
 
-def base_send_email(
+def render_email_message(
     subject: str,
     email_html_template_name: str,
     email_text_template_name: str,
     context: dict,
     from_email: str,
     to_email: str,
-):
+    connection=None,
+) -> EmailMultiAlternatives:
     """
-    Send a django.core.mail.EmailMultiAlternatives to `to_email`.
-    Renders provided templates and send it to to_email
-    Low level, Don't use this directly
+    Renders provided templates into a django.core.mail.EmailMultiAlternatives for `to_email`.
     """
     # Subject
     subject = ''.join(
@@ -32,19 +37,72 @@ def base_send_email(
         subject.splitlines()
     )
     # Body
-    html_content = loader.render_to_string(email_html_template_name, context)
-    text_content = loader.render_to_string(email_text_template_name, context)
+    html_content = render_email_template(email_html_template_name, context)
+    text_content = render_email_template(email_text_template_name, context)
     # Email message
     email_message = EmailMultiAlternatives(
         subject,
         text_content,  # Plain text
         from_email,
         [to_email],
+        connection=connection,
     )
     # HTML
     email_message.attach_alternative(html_content, "text/html")
-    # Send email
-    email_message.send()
+    return email_message
+
+
+def base_send_email(
+    subject: str,
+    email_html_template_name: str,
+    email_text_template_name: str,
+    context: dict,
+    from_email: str,
+    to_email: str,
+):
+    """
+    Send a django.core.mail.EmailMultiAlternatives to `to_email`.
+    Renders provided templates and send it to to_email
+    Low level, Don't use this directly
+    """
+    render_email_message(
+        subject,
+        email_html_template_name,
+        email_text_template_name,
+        context,
+        from_email,
+        to_email,
+    ).send()
+
+
+def get_common_email_context(user: User, email_type: EmailNotificationType) -> dict:
+    return {
+        'client_domain': settings.APP_FRONTEND_HOST,
+        'protocol': settings.APP_HTTP_PROTOCOL,
+        'site_name': settings.APP_SITE_NAME,
+        'domain': settings.APP_DOMAIN,
+        'user': user,
+        'email_type': email_type,
+        'unsubscribe_email_types': User.OPT_EMAIL_NOTIFICATION_TYPES,
+        'unsubscribe_email_token':
+            TokenManager.unsubscribe_email_token_generator.make_token(user),
+        'unsubscribe_email_id':
+            urlsafe_base64_encode(force_bytes(user.pk)),
+    }
+
+
+def get_serializable_email_context(context: dict) -> dict:
+    """
+    Outbox context is stored as JSON.
+    Datetime are rendered here (same as the template would) to keep the timezone/format of the request.
+    """
+    return {
+        key: (
+            formats.localize(timezone.template_localtime(value))
+            if isinstance(value, datetime.datetime) else value
+        )
+        for key, value in context.items()
+    }
 
 
 def send_email(
@@ -57,8 +115,9 @@ def send_email(
 ):
     """
     Validates email request
-    Add common context variable
+    Enqueue the email to the outbox (Sent by ./manage.py send_email_outbox)
     """
+
     if user.invalid_email:
         logger.warning(
             '[{}] Email not sent: User <{}>({}) email flagged as invalid email!!'.format(
@@ -74,27 +133,263 @@ def send_email(
         )
         return
 
-    if context is None:
-        context = {}
-    context.update({
-        'client_domain': settings.APP_FRONTEND_HOST,
-        'protocol': settings.APP_HTTP_PROTOCOL,
-        'site_name': settings.APP_SITE_NAME,
-        'domain': settings.APP_DOMAIN,
-        'user': user,
-        'email_type': email_type,
-        'unsubscribe_email_types': User.OPT_EMAIL_NOTIFICATION_TYPES,
-        'unsubscribe_email_token':
-            TokenManager.unsubscribe_email_token_generator.make_token(user),
-        'unsubscribe_email_id':
-            urlsafe_base64_encode(force_bytes(user.pk)),
-    })
+    outbox_model = EmailOutbox
+    if settings.EMAIL_DIGEST_WINDOW and email_type in EmailNotificationType.get_digestible():
+        # First event in a window is sent right away (eg: security alerts),
+        # only the follow-ups are coalesced into a single email later (See flush_email_digests)
+        window_start = timezone.now() - datetime.timedelta(seconds=settings.EMAIL_DIGEST_WINDOW)
+        if (
+            EmailDigestEvent.objects.filter(user=user, email_type=email_type).exists() or
+            EmailOutbox.objects.filter(user=user, email_type=email_type, created_at__gte=window_start).exists()
+        ):
+            outbox_model = EmailDigestEvent
+    outbox_model.objects.create(
+        user=user,
+        email_type=email_type,
+        subject=subject,
+        email_html_template_name=email_html_template_name,
+        email_text_template_name=email_text_template_name,
+        context=get_serializable_email_context(context or {}),
+    )
 
-    base_send_email(
-        subject,
-        email_html_template_name,
-        email_text_template_name,
-        context,
-        settings.EMAIL_FROM,
-        user.email,
+
+def flush_email_digests() -> int:
+    """
+    Enqueue digest events (follow-ups, See send_email) to the outbox, a single email per user/type once the
+    oldest event is older than EMAIL_DIGEST_WINDOW. Single event is sent as it is.
+    Returns number of emails enqueued
+    """
+    window_end = timezone.now() - datetime.timedelta(seconds=settings.EMAIL_DIGEST_WINDOW)
+    due_user_email_types = EmailDigestEvent.objects\
+        .values('user_id', 'email_type')\
+        .annotate(first_created_at=models.Min('created_at'))\
+        .filter(first_created_at__lte=window_end)\
+        .values_list('user_id', 'email_type')
+
+    enqueued_count = 0
+    for user_id, email_type in due_user_email_types:
+        with transaction.atomic():
+            # Lock the events, so that multiple workers don't send the same digest
+            events = list(
+                EmailDigestEvent.objects.filter(
+                    user_id=user_id,
+                    email_type=email_type,
+                ).select_for_update(skip_locked=True).order_by('created_at')
+            )
+            if not events:
+                continue
+            if len(events) == 1:
+                outbox = EmailOutbox(
+                    user_id=user_id,
+                    email_type=email_type,
+                    subject=events[0].subject,
+                    email_html_template_name=events[0].email_html_template_name,
+                    email_text_template_name=events[0].email_text_template_name,
+                    context=events[0].context,
+                )
+            else:
+                email_type_label = EmailNotificationType(email_type).label
+                outbox = EmailOutbox(
+                    user_id=user_id,
+                    email_type=email_type,
+                    subject=f'QB: {email_type_label} ({len(events)})',
+                    email_html_template_name='emails/digest/content.html',
+                    email_text_template_name='emails/digest/content.txt',
+                    context={
+                        'email_type_label': email_type_label,
+                        'events': [
+                            {
+                                'subject': event.subject,
+                                **event.context,
+                            }
+                            for event in events
+                        ],
+                    },
+                )
+            outbox.save()
+            EmailDigestEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+            enqueued_count += 1
+    return enqueued_count
+
+
+def get_email_outbox_retry_delay(attempts: int) -> datetime.timedelta:
+    # Exponential backoff: base, base * 2, base * 4, ...
+    return datetime.timedelta(
+        seconds=min(
+            settings.EMAIL_OUTBOX_RETRY_BACKOFF * (2 ** (attempts - 1)),
+            settings.EMAIL_OUTBOX_MAX_RETRY_BACKOFF,
+        ),
+    )
+
+
+def claim_email_outbox_batch(batch_size: int) -> list[EmailOutbox]:
+    """
+    Mark due emails as SENDING in a short transaction, so that the emails are sent without holding the row locks
+    Rows are locked (SKIP LOCKED) so that multiple workers can run at the same time
+    NOTE: SENDING emails not finished within EMAIL_OUTBOX_SENDING_TIMEOUT (eg: worker died) are claimed again
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        outbox_items = list(
+            EmailOutbox.objects.filter(
+                status__in=[EmailOutbox.Status.PENDING, EmailOutbox.Status.SENDING],
+                next_attempt_at__lte=now,
+            ).select_related('user').select_for_update(
+                skip_locked=True,
+                of=('self',),
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        for outbox in outbox_items:
+            outbox.status = EmailOutbox.Status.SENDING
+            outbox.attempts += 1
+            outbox.next_attempt_at = now + datetime.timedelta(seconds=settings.EMAIL_OUTBOX_SENDING_TIMEOUT)
+        EmailOutbox.objects.bulk_update(outbox_items, ('status', 'attempts', 'next_attempt_at'))
+    return outbox_items
+
+
+def set_email_outbox_failure(outbox: EmailOutbox, error: Exception):
+    logger.warning(
+        '[{}] Email not sent: Outbox <{}> (attempt: {})'.format(
+            outbox.email_type, outbox.pk, outbox.attempts,
+        ),
+        exc_info=error,
     )
+    outbox.last_error = repr(error)
+    if outbox.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        outbox.status = EmailOutbox.Status.FAILED
+        outbox.context = {}
+    else:
+        outbox.status = EmailOutbox.Status.PENDING
+        outbox.next_attempt_at = timezone.now() + get_email_outbox_retry_delay(outbox.attempts)
+
+
+def send_email_outbox_batch(batch_size: int) -> tuple[int, int]:
+    """
+    Send claimed emails from the outbox using a single email backend connection
+    Returns (sent, failed) count
+    """
+    sent_count = failed_count = 0
+    outbox_items = claim_email_outbox_batch(batch_size)
+    if not outbox_items:
+        return sent_count, failed_count
+
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as e:
+        # Connection failure is recorded as a failed attempt for all the claimed emails
+        for outbox in outbox_items:
+            set_email_outbox_failure(outbox, e)
+        failed_count = len(outbox_items)
+    else:
+        try:
+            for outbox in outbox_items:
+                user = outbox.user
+                try:
+                    render_email_message(
+                        outbox.subject,
+                        outbox.email_html_template_name,
+                        outbox.email_text_template_name,
+                        {
+                            **outbox.context,
+                            **get_common_email_context(user, outbox.email_type),
+                        },
+                        settings.EMAIL_FROM,
+                        user.email,
+                        connection=connection,
+                    ).send()
+                except Exception as e:
+                    failed_count += 1
+                    set_email_outbox_failure(outbox, e)
+                else:
+                    sent_count += 1
+                    outbox.status = EmailOutbox.Status.SENT
+                    outbox.sent_at = timezone.now()
+                    outbox.last_error = ''
+                    outbox.context = {}
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning('Failed to close email connection', exc_info=True)
+    EmailOutbox.objects.bulk_update(
+        outbox_items,
+        ('status', 'next_attempt_at', 'last_error', 'sent_at', 'context'),
+    )
+    return sent_count, failed_count
+
+
+def prune_email_outbox(batch_size: int = 1000) -> int:
+    """
+    Delete SENT emails older than EMAIL_OUTBOX_SENT_RETENTION (in batches, to keep the transactions short)
+    Returns number of emails deleted
+    """
+    sent_before = timezone.now() - datetime.timedelta(seconds=settings.EMAIL_OUTBOX_SENT_RETENTION)
+    total_deleted = 0
+    while True:
+        deleted, _ = EmailOutbox.objects.filter(
+            pk__in=models.Subquery(
+                EmailOutbox.objects.filter(
+                    status=EmailOutbox.Status.SENT,
+                    sent_at__lt=sent_before,
+                ).values('pk')[:batch_size]
+            ),
+        ).delete()
+        total_deleted += deleted
+        if deleted < batch_size:
+            return total_deleted
+
+
+def get_email_subscribed_users(
+    email_type: EmailNotificationType,
+    users_qs: typing.Optional[models.QuerySet[User]] = None,
+) -> models.QuerySet[User]:
+    """
+    Same as the send_email validation (invalid_email, User.is_email_subscribed_for) but in SQL
+    """
+    if users_qs is None:
+        users_qs = User.objects.all()
+    users_qs = users_qs.filter(invalid_email=False)
+    if email_type in User.OPT_EMAIL_NOTIFICATION_TYPES:
+        users_qs = users_qs.exclude(email_opt_outs__contains=[email_type])
+    return users_qs
+
+
+def send_bulk_email(
+    email_type: EmailNotificationType,
+    subject: str,
+    email_html_template_name: str,
+    email_text_template_name: str,
+    context: None | dict = None,
+    users_qs: typing.Optional[models.QuerySet[User]] = None,
+    chunk_size: int = 500,
+) -> int:
+    """
+    Send same email to many users (eg: campaigns for NEWS_AND_OFFERS)
+    Eligible users are streamed from the database and enqueued to the outbox in chunks (bulk_create).
+    All chunks are enqueued in a single transaction, so a failed campaign can be retried without duplicates.
+    The outbox worker sends them in batches using a single backend connection, with retries for each email.
+    Returns number of emails enqueued
+    """
+    serializable_context = get_serializable_email_context(context or {})
+    user_ids_iterator = get_email_subscribed_users(email_type, users_qs=users_qs)\
+        .order_by('pk')\
+        .values_list('pk', flat=True)\
+        .iterator(chunk_size=chunk_size)
+    enqueued_count = 0
+    with transaction.atomic():
+        while user_ids := list(itertools.islice(user_ids_iterator, chunk_size)):
+            EmailOutbox.objects.bulk_create([
+                EmailOutbox(
+                    user_id=user_id,
+                    email_type=email_type,
+                    subject=subject,
+                    email_html_template_name=email_html_template_name,
+                    email_text_template_name=email_text_template_name,
+                    context=serializable_context,
+                )
+                for user_id in user_ids
+            ])
+            enqueued_count += len(user_ids)
+    logger.info(f'[{email_type}] Bulk email: {enqueued_count} enqueued')
+    return enqueued_count
@@ -0,0 +1,146 @@
+import datetime
+import functools
+import re
+import typing
+
+from django.db import models
+from django.template import loader
+from django.utils import timezone, formats
+
+# Placeholders used for the per-recipient values in the cached skeleton
+SLOT_FORMAT = 'qbemailslot{}x'
+SLOT_RE = re.compile(r'qbemailslot(\d+)x')
+SLOT_LEFTOVER_RE = re.compile(r'qbemailslot', re.IGNORECASE)
+# Changed by the template (autoescape) or by premailer (lxml re-serialise), output depends on the position
+UNSAFE_VALUE_RE = re.compile(r'[<>&"\']')
+
+SKELETON_CACHE_SIZE = 128
+
+
+class UncachableTemplate(Exception):
+    pass
+
+
+class _ObjectPlaceholder:
+    """
+    Used in place of model instances (eg: user).
+    Attributes accessed by the template are recorded as slots.
+    """
+    def __init__(self, name, slots):
+        self._name = name
+        self._slots = slots
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        self._slots.append((self._name, attr))
+        return SLOT_FORMAT.format(len(self._slots) - 1)
+
+
+def _is_dynamic(value) -> bool:
+    """
+    Per-recipient values, these are substituted into the skeleton.
+    Everything else (bool, int, None, empty string, list) is part of the skeleton cache key.
+    """
+    return (
+        (isinstance(value, str) and bool(value)) or
+        isinstance(value, (datetime.date, models.Model))
+    )
+
+
+def _get_skeleton_key(context: dict) -> tuple:
+    key = []
+    for name, value in sorted(context.items()):
+        if _is_dynamic(value):
+            key.append((name, _ObjectPlaceholder if isinstance(value, models.Model) else str))
+            continue
+        if isinstance(value, list):
+            value = tuple(value)
+        hash(value)  # Raises TypeError for unhashable values
+        key.append((name, value))
+    return tuple(key)
+
+
+def _get_attribute_slots(skeleton: str) -> frozenset[int]:
+    """
+    Slots used inside a tag (eg: href="...")
+    """
+    return frozenset(
+        int(match.group(1))
+        for match in SLOT_RE.finditer(skeleton)
+        if skeleton.rfind('<', 0, match.start()) > skeleton.rfind('>', 0, match.start())
+    )
+
+
+@functools.lru_cache(maxsize=SKELETON_CACHE_SIZE)
+def _get_skeleton(template_name: str, skeleton_key: tuple) -> tuple[str, tuple, frozenset[int]]:
+    """
+    Render the template (including premailer CSS inlining) once using placeholders for per-recipient values
+    Returns (skeleton, slots, attribute slots). slots[i] -> (context name, attribute or None)
+    """
+    slots = []
+    skeleton_context = {}
+    for name, value in skeleton_key:
+        if value is _ObjectPlaceholder:
+            skeleton_context[name] = _ObjectPlaceholder(name, slots)
+        elif value is str:
+            slots.append((name, None))
+            skeleton_context[name] = SLOT_FORMAT.format(len(slots) - 1)
+        else:
+            skeleton_context[name] = value
+    skeleton = loader.render_to_string(template_name, skeleton_context)
+    # Placeholders modified by the template (eg: filters), can't substitute these
+    if len(SLOT_RE.findall(skeleton)) != len(SLOT_LEFTOVER_RE.findall(skeleton)):
+        raise UncachableTemplate(template_name)
+    return skeleton, tuple(slots), _get_attribute_slots(skeleton)
+
+
+def _render_value(value, in_attribute: bool) -> str | None:
+    """
+    Returns the value as rendered by the template + premailer, None if that depends on the position in the template.
+    Values without the special characters are not changed by either (autoescape/lxml).
+    NOTE: lxml URL-encodes non-ASCII characters in the attributes (eg: href)
+    """
+    if isinstance(value, datetime.datetime):
+        value = timezone.template_localtime(value)
+    value = str(formats.localize(value))
+    if UNSAFE_VALUE_RE.search(value) or (in_attribute and not value.isascii()):
+        return None
+    return value
+
+
+def render_email_template(template_name: str, context: dict) -> str:
+    """
+    Cached alternative to loader.render_to_string for email templates.
+    Compiled template and the premailer inlined skeleton are cached per template (and static context),
+    only the per-recipient values are substituted for each render.
+    Output is same as loader.render_to_string, which is used for the values that can't be substituted as it is.
+    NOTE: Per-recipient values (non-empty string, date/datetime, model instances) should only be
+    printed by the template (not compared or modified by filters), otherwise use loader.render_to_string
+    """
+    try:
+        skeleton, slots, attribute_slots = _get_skeleton(template_name, _get_skeleton_key(context))
+    except (TypeError, UncachableTemplate):
+        return loader.render_to_string(template_name, context)
+
+    values = []
+    for index, (name, attr) in enumerate(slots):
+        value = context[name]
+        if attr is not None:
+            value = getattr(value, attr)
+            if not value:
+                # Falsy attributes can change the template flow, skeleton is not valid for this
+                return loader.render_to_string(template_name, context)
+        rendered_value = _render_value(value, index in attribute_slots)
+        if rendered_value is None:
+            return loader.render_to_string(template_name, context)
+        values.append(rendered_value)
+    return SLOT_RE.sub(lambda match: values[int(match.group(1))], skeleton)
+
+
+def clear_email_template_cache():
+    _get_skeleton.cache_clear()
+
+
+def get_email_template_cache_info() -> typing.NamedTuple:
+    return _get_skeleton.cache_info()
@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class ConcatOp(models.Func):
+    """
+    Concatenate using `||` operator instead of CONCAT()
+    CONCAT() is not IMMUTABLE in postgresql, so it can't be used in index expressions.
+    NOTE: Result is NULL if any of the values is NULL, use only for the non-null fields.
+    """
+    template = '(%(expressions)s)'
+    arg_joiner = ' || '
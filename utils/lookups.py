@@ -0,0 +1,16 @@
+from django.db import models
+
+
+@models.CharField.register_lookup
+@models.TextField.register_lookup
+class ILikeContains(models.lookups.IContains):
+    """
+    Same as icontains, but generates `column ILIKE '%value%'` instead of `UPPER(column) LIKE UPPER('%value%')`
+    which can use pg_trgm GIN indexes (gin_trgm_ops) defined on the column.
+    """
+    lookup_name = 'ilike_contains'
+
+    def as_postgresql(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs_sql} ILIKE {rhs_sql}', [*lhs_params, *rhs_params]
@@ -0,0 +1,167 @@
+import hashlib
+import inspect
+import functools
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+from graphql import print_ast
+from strawberry.types import Info
+
+from main.caches import shared_cache, CacheKey
+
+
+logger = logging.getLogger(__name__)
+
+# Reservation is released after this, if the worker dies while executing the mutation
+IN_PROGRESS_TIMEOUT = 60
+
+
+class IdempotencyKeyError(Exception):
+    pass
+
+
+class BaseIdempotencyStore:
+    """
+    Storage for the first successful response of an idempotent mutation.
+    Records are (request fingerprint, response), response is None while the mutation is in progress.
+    Sub-class this to use different storage (eg: database)
+    NOTE: Retries can reach any of the workers, so the storage should be shared between the processes
+    """
+    def get(self, key: str) -> tuple[str, object] | None:
+        raise NotImplementedError
+
+    def add(self, key: str, record: tuple[str, object], timeout: int) -> bool:
+        """
+        Set only if the key doesn't exist (atomic). Returns True if set
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, record: tuple[str, object], timeout: int):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class CacheIdempotencyStore(BaseIdempotencyStore):
+    def __init__(self, cache=shared_cache):
+        self.cache = cache
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def add(self, key, record, timeout):
+        return self.cache.add(key, record, timeout)
+
+    def set(self, key, record, timeout):
+        self.cache.set(key, record, timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+
+@functools.cache
+def get_idempotency_store() -> BaseIdempotencyStore:
+    return import_string(settings.IDEMPOTENCY_STORE)()
+
+
+def get_idempotency_cache_key(info: Info) -> str | None:
+    """
+    Key is scoped using (user, idempotency key, mutation path)
+    Returns None if idempotency key is not provided or user is anonymous
+    """
+    request = info.context.request
+    idempotency_key = request.headers.get(settings.IDEMPOTENCY_KEY_HEADER)
+    if not idempotency_key or request.user.is_anonymous:
+        return None
+    mutation_path = '.'.join(str(path) for path in info.path.as_list())
+    return CacheKey.IDEMPOTENCY_KEY_FORMAT.format(
+        user_id=request.user.pk,
+        key_hash=hashlib.sha256(f'{mutation_path}:{idempotency_key}'.encode()).hexdigest(),
+    )
+
+
+def get_request_fingerprint(info: Info) -> str:
+    """
+    Hash of the operation and variables (mutation payload, projectScope pk, etc)
+    Used to reject reuse of an idempotency key with a different request
+    """
+    return hashlib.sha256(
+        json.dumps(
+            [print_ast(info.operation), info.variable_values],
+            sort_keys=True,
+            cls=DjangoJSONEncoder,
+        ).encode()
+    ).hexdigest()
+
+
+def is_response_replayable(response) -> bool:
+    """
+    Failed responses (validation/permission/unexpected errors) are not stored, retries should execute again.
+    NOTE: Bulk responses with partially applied changes are stored, those changes shouldn't be applied again
+    """
+    if hasattr(response, 'ok'):
+        return response.ok
+    return bool(response.results or response.deleted) or not response.errors
+
+
+def reserve_idempotency_key(store: BaseIdempotencyStore, cache_key: str, fingerprint: str):
+    """
+    Reserve the key for the current request. Returns the stored response if it is a retry (None if reserved)
+    """
+    if store.add(cache_key, (fingerprint, None), IN_PROGRESS_TIMEOUT):
+        return None
+    if (record := store.get(cache_key)) is None:
+        raise IdempotencyKeyError('Request with the same idempotency key was just processed, please retry')
+    stored_fingerprint, response = record
+    if response is None:
+        raise IdempotencyKeyError('Request with the same idempotency key is in progress')
+    if stored_fingerprint != fingerprint:
+        raise IdempotencyKeyError('Idempotency key is already used for a different request')
+    logger.debug(f'Replaying response for idempotency key: {cache_key}')
+    return response
+
+
+def release_idempotency_key(store: BaseIdempotencyStore, cache_key: str, fingerprint: str, response=None):
+    """
+    Store the replayable response, otherwise release the reservation so that the retries can execute again
+    """
+    if response is not None and is_response_replayable(response):
+        store.set(cache_key, (fingerprint, response), settings.IDEMPOTENCY_KEY_TTL)
+    else:
+        store.delete(cache_key)
+
+
+def idempotent_mutation(func):
+    """
+    Store the first successful response for (user, idempotency key, mutation path)
+    and replay it for the retries without executing the mutation again.
+    Key is reserved while the mutation is executing, so the concurrent retries are rejected.
+    NOTE: Decorated function should have `info` argument
+    NOTE: Store can do network I/O (eg: Redis), so it is used using sync_to_async
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def _wrapper(*args, **kwargs):
+        info = signature.bind(*args, **kwargs).arguments['info']
+        cache_key = get_idempotency_cache_key(info)
+        if cache_key is None:
+            return await func(*args, **kwargs)
+        store = get_idempotency_store()
+        fingerprint = get_request_fingerprint(info)
+        if (stored_response := await sync_to_async(reserve_idempotency_key)(store, cache_key, fingerprint)) is not None:
+            return stored_response
+        try:
+            response = await func(*args, **kwargs)
+        except BaseException:
+            await sync_to_async(release_idempotency_key)(store, cache_key, fingerprint)
+            raise
+        await sync_to_async(release_idempotency_key)(store, cache_key, fingerprint, response)
+        return response
+
+    return _wrapper
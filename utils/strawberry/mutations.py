@@ -9,6 +9,8 @@ from django.db import transaction, models
 
 from utils.common import to_snake_case
 from utils.strawberry.transformers import generate_type_for_serializer
+from utils.strawberry.idempotency import idempotent_mutation
+from apps.common.models import UserResource
 from apps.project.models import Project
 
 
@@ -73,10 +75,10 @@ class _CustomErrorType:
     )
 
     @staticmethod
-    def generate_message(message: str = DEFAULT_ERROR_MESSAGE) -> CustomErrorType:
+    def generate_message(message: str = DEFAULT_ERROR_MESSAGE, field: str = 'nonFieldErrors') -> CustomErrorType:
         return CustomErrorType([
             dict(
-                field='nonFieldErrors',
+                field=field,
                 messages=message,
                 object_errors=None,
                 array_errors=None,
@@ -212,6 +214,7 @@ class ModelMutation:
         self.InputType = generate_type_for_serializer(
             name + 'CreateInput',
             self.serializer_class,
+            exclude_fields=getattr(self.serializer_class, 'update_only_fields', ()),
         )
         self.PartialInputType = generate_type_for_serializer(
             name + 'UpdateInput',
@@ -249,6 +252,11 @@ class ModelMutation:
         try:
             with transaction.atomic():
                 instance = serializer.save()
+        except UserResource.VersionConflict:
+            return _CustomErrorType.generate_message(
+                'This has been modified by someone else. Please reload and try again.',
+                field='versionId',
+            ), None
         except Exception:
             logger.error('Failed to handle mutation', exc_info=True)
             return _CustomErrorType.generate_message(), None
@@ -267,6 +275,7 @@ class ModelMutation:
             logger.error('Failed to handle delete mutation', exc_info=True)
             return _CustomErrorType.generate_message(), None
 
+    @idempotent_mutation
     async def handle_create_mutation(self, data, info: Info, permission) -> MutationResponseType:
         if errors := self.check_permissions(info, permission):
             return MutationResponseType(ok=False, errors=errors)
@@ -279,6 +288,7 @@ class ModelMutation:
             return MutationResponseType(ok=False, errors=errors)
         return MutationResponseType(result=saved_instance)
 
+    @idempotent_mutation
     async def handle_update_mutation(
         self,
         data,
@@ -299,6 +309,7 @@ class ModelMutation:
             return MutationResponseType(ok=False, errors=errors)
         return MutationResponseType(result=saved_instance)
 
+    @idempotent_mutation
     async def handle_delete_mutation(self, instance: models.Model | None, info: Info, permission) -> MutationResponseType:
         if errors := self.check_permissions(info, permission):
             return MutationResponseType(ok=False, errors=errors)
@@ -312,6 +323,7 @@ class ModelMutation:
             return MutationResponseType(ok=False, errors=errors)
         return MutationResponseType(result=deleted_instance)
 
+    @idempotent_mutation
     async def handle_bulk_mutation(
         self,
         base_queryset: models.QuerySet,
@@ -1,3 +1,4 @@
+import copy
 from rest_framework import serializers
 
 
@@ -15,3 +16,25 @@ class StringIDField(serializers.CharField):
     check out utils/graphene/mutation.py
     """
     pass
+
+
+class CachedFieldsSerializerMixin(serializers.Serializer):
+    """
+    Build the fields/validators once per serializer class and reuse (deep-copy) them for each instance.
+    DRF rebuilds them (model introspection + deep-copy of declared fields) for each instance,
+    which is costly for bulk mutations where a serializer is created for each item.
+    NOTE: Opt-in, only use this for serializers where fields/validators doesn't depend on instance/context.
+    """
+
+    def get_fields(self):
+        serializer_class = type(self)
+        # NOTE: Using __dict__ to make sure cache is not shared with the sub-classes
+        if '_cached_fields' not in serializer_class.__dict__:
+            serializer_class._cached_fields = super().get_fields()
+        return copy.deepcopy(serializer_class._cached_fields)
+
+    def get_validators(self):
+        serializer_class = type(self)
+        if '_cached_validators' not in serializer_class.__dict__:
+            serializer_class._cached_validators = super().get_validators()
+        return copy.deepcopy(serializer_class._cached_validators)
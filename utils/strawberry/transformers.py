@@ -233,11 +233,12 @@ def generate_type_for_serializer(
     name: str,
     serializer_class,
     partial=False,
+    exclude_fields: tuple[str, ...] = (),
 ) -> type:
     data_members = fields_for_serializer(
         serializer_class(),
         only_fields=[],
-        exclude_fields=[],
+        exclude_fields=exclude_fields,
         partial=partial,
     )
     defaults_model_fields = [